@@ -0,0 +1,85 @@
+"""Bounded per-fan activity log.
+
+The most recent activities are kept as compact (timestamp, activity,
+points) tuples in a fixed-size ring buffer. Entries pushed out of the
+buffer are folded into per-day (count, points) rollups, and only the most
+recent `rollup_days` days of rollups are kept, so a fan's log stays the
+same size however active they are.
+"""
+import sys
+from collections import deque
+from datetime import date, datetime
+
+
+class ActivityLog:
+    """Ring buffer of recent activities plus daily rollups of older ones"""
+
+    __slots__ = ('_records', '_rollups', 'rollup_days')
+
+    def __init__(self, capacity=200, rollup_days=90, records=(), rollups=None):
+        """
+        Args:
+            capacity: Recent activities kept individually
+            rollup_days: Days of rollups kept for evicted activities
+            records: Initial (timestamp, activity, points) tuples, oldest first
+            rollups: Initial dict of ISO day -> [count, points]
+        """
+        self._records = deque(maxlen=capacity)
+        self._rollups = {day: list(totals) for day, totals in (rollups or {}).items()}
+        self.rollup_days = rollup_days
+        for timestamp, activity, points in records:
+            self.append(timestamp, activity, points)
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def capacity(self):
+        return self._records.maxlen
+
+    def append(self, timestamp, activity, points):
+        """Record an activity; timestamp is a datetime or epoch seconds"""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        if len(self._records) == self._records.maxlen:
+            self._roll_up(self._records[0])
+        # Activity texts repeat a lot; interning stores each distinct text once
+        self._records.append((float(timestamp), sys.intern(activity), int(points)))
+
+    def page(self, offset=0, limit=20):
+        """Recent activities newest first, as dicts with a datetime timestamp"""
+        if offset < 0 or limit < 0:
+            raise ValueError(f"offset and limit must not be negative, got {offset} and {limit}")
+        newest = len(self._records) - 1 - offset
+        oldest = max(-1, newest - limit)
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(self._records[position][0]),
+                'activity': self._records[position][1],
+                'points': self._records[position][2]
+            }
+            for position in range(newest, oldest, -1)
+        ]
+
+    def rollups(self):
+        """Daily totals of activities no longer kept individually, oldest day first
+
+        Returns:
+            List of (date, count, points) tuples
+        """
+        return [
+            (date.fromisoformat(day), count, points)
+            for day, (count, points) in sorted(self._rollups.items())
+        ]
+
+    def _roll_up(self, record):
+        timestamp, _, points = record
+        day = date.fromtimestamp(timestamp).isoformat()
+        totals = self._rollups.get(day)
+        if totals is None:
+            totals = self._rollups[day] = [0, 0]
+            if len(self._rollups) > self.rollup_days:
+                # ISO dates sort chronologically
+                del self._rollups[min(self._rollups)]
+        totals[0] += 1
+        totals[1] += points
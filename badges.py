@@ -0,0 +1,81 @@
+"""Table-driven badge definitions and evaluation.
+
+Each badge is awarded when one counter (points, streak or an achievement
+counter) reaches a threshold. BadgeEngine indexes the badges by counter
+with their thresholds sorted, so a counter change only looks at the badges
+watching that counter and finds the ones reached with a binary search.
+"""
+import bisect
+
+BADGES = [
+    {'name': 'Rookie Fan', 'counter': 'points', 'threshold': 100, 'icon': '👶', 'description': 'Earn your first 100 points'},
+    {'name': 'All-Star Fan', 'counter': 'points', 'threshold': 500, 'icon': '⭐', 'description': 'Reach 500 points'},
+    {'name': 'MVP Fan', 'counter': 'points', 'threshold': 1000, 'icon': '🏆', 'description': 'Achieve 1000 points'},
+    {'name': 'Perfect Attendance', 'counter': 'streak', 'threshold': 7, 'icon': '📅', 'description': 'Login 7 days in a row'},
+    {'name': 'Super Fan', 'counter': 'streak', 'threshold': 30, 'icon': '🌟', 'description': '30-day login streak'},
+    {'name': 'Game Guru', 'counter': 'correct_predictions', 'threshold': 10, 'icon': '🎯', 'description': 'Make 10 correct game predictions'},
+    {'name': 'Social Butterfly', 'counter': 'social_shares', 'threshold': 5, 'icon': '🦋', 'description': 'Share 5 times on social media'},
+    {'name': 'Scout', 'counter': 'player_profiles_viewed', 'threshold': 20, 'icon': '🔍', 'description': 'View 20 different player profiles'},
+    {'name': 'Video Analyst', 'counter': 'video_analyses_watched', 'threshold': 10, 'icon': '📹', 'description': 'Watch 10 video analyses'},
+    {'name': 'Team Loyalist', 'counter': 'team_selection', 'threshold': 1, 'icon': '⚾', 'description': 'Select your favorite team'}
+]
+
+
+class BadgeEngine:
+    """Evaluates badge thresholds per counter"""
+
+    def __init__(self, badges=BADGES):
+        self.badges = {badge['name']: badge for badge in badges}
+        self._order = {name: position for position, name in enumerate(self.badges)}
+        by_counter = {}
+        for badge in badges:
+            by_counter.setdefault(badge['counter'], []).append((badge['threshold'], badge['name']))
+        self._thresholds = {}
+        self._names = {}
+        for counter, entries in by_counter.items():
+            entries.sort()
+            self._thresholds[counter] = [threshold for threshold, _ in entries]
+            self._names[counter] = [name for _, name in entries]
+
+    def evaluate(self, counter, value, earned):
+        """Badges of `counter` newly reached at `value`, given the earned set
+
+        Counters only grow, so the earned badges of a counter are a prefix
+        of its sorted thresholds; the scan stops at the first earned one and
+        only costs the binary search plus the badges actually awarded.
+        """
+        thresholds = self._thresholds.get(counter)
+        if not thresholds:
+            return []
+        names = self._names[counter]
+        awarded = []
+        for position in range(bisect.bisect_right(thresholds, value) - 1, -1, -1):
+            if names[position] in earned:
+                break
+            awarded.append(names[position])
+        return awarded
+
+    def evaluate_all(self, counters, earned):
+        """Every badge reached by a dict of counter values that is not yet earned
+
+        Unlike evaluate this checks whole prefixes, so badges added to the
+        table after a fan passed their threshold are still awarded.
+        """
+        awarded = []
+        for counter, value in counters.items():
+            thresholds = self._thresholds.get(counter)
+            if thresholds:
+                reached = self._names[counter][:bisect.bisect_right(thresholds, value)]
+                awarded.extend(name for name in reached if name not in earned)
+        return awarded
+
+    def info(self, names):
+        """(name, {'icon', 'description'}) pairs in table order"""
+        return [
+            (name, {'icon': self.badges[name]['icon'], 'description': self.badges[name]['description']})
+            for name in sorted(names, key=lambda name: self._order.get(name, len(self._order)))
+            if name in self.badges
+        ]
+
+
+badge_engine = BadgeEngine()
@@ -0,0 +1,93 @@
+"""Loader benchmark for the memory-mapped pitch event store.
+
+Builds a full simulated season (2,430 games x 300 pitches) in a temporary
+directory, then times per-game and per-player reads. "Cold" reads evict the
+store's files from the OS page cache first; "warm" reads repeat the same
+queries against already cached pages.
+
+    python benchmarks/event_store_bench.py [--games 2430] [--pitches 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import PitchEventStore, simulate_pitch_events
+
+
+def evict_page_cache(root):
+    """Ask the kernel to drop cached pages of every file in the store"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            fd = os.open(os.path.join(dirpath, filename), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return True
+
+
+def time_queries(store, game_ids, player_ids):
+    start = time.perf_counter()
+    for game_id in game_ids:
+        store.game_events(int(game_id))
+    game_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for player_id in player_ids:
+        store.player_events(int(player_id), role='batter')
+    player_seconds = time.perf_counter() - start
+    return game_seconds, player_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=2430)
+    parser.add_argument('--pitches', type=int, default=300)
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--segments', type=int, default=10, help="Appends used to write the season")
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    games_df = pd.DataFrame({'game_id': np.arange(1, args.games + 1)})
+    players_df = pd.DataFrame({
+        'player_id': np.arange(1, args.players + 1),
+        'position': rng.choice(['P', 'C', '1B', 'SS', 'CF'], args.players)
+    })
+
+    with tempfile.TemporaryDirectory() as root:
+        store = PitchEventStore(root)
+        start = time.perf_counter()
+        for positions in np.array_split(np.arange(len(games_df)), args.segments):
+            chunk = games_df.iloc[positions]
+            store.append(simulate_pitch_events(chunk, players_df, args.pitches, seed=len(store)))
+        write_seconds = time.perf_counter() - start
+        print(f"wrote {len(store):,} pitches in {len(store.segments)} segments: {write_seconds:.2f}s")
+
+        game_ids = rng.choice(games_df['game_id'], args.queries)
+        player_ids = rng.choice(players_df['player_id'], args.queries)
+
+        evicted = evict_page_cache(root)
+        cold_store = PitchEventStore(root)
+        cold = time_queries(cold_store, game_ids, player_ids)
+        warm = time_queries(cold_store, game_ids, player_ids)
+
+        label = "cold" if evicted else "cold (page cache not evicted)"
+        for name, (game_seconds, player_seconds) in ((label, cold), ("warm", warm)):
+            print(
+                f"{name:>8}: game slice {game_seconds / args.queries * 1e3:.3f} ms, "
+                f"player slice {player_seconds / args.queries * 1e3:.3f} ms"
+            )
+
+
+if __name__ == '__main__':
+    main()
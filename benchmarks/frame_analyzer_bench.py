@@ -0,0 +1,80 @@
+"""Throughput benchmark for the local frame sampling highlight analyzer.
+
+Scores synthetic grayscale frame chunks with frame_analyzer.score_frame_chunk,
+first in this process and then on a process pool, and reports frames per
+second per core. Decoding is excluded so the numbers isolate the NumPy
+scoring cost; pass --video to also time end-to-end analysis of a real file,
+where each worker decodes its own frame range (needs opencv-python-headless).
+
+    python benchmarks/frame_analyzer_bench.py [--workers 4] [--video game.mp4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import frame_analyzer
+
+
+def synthetic_chunks(chunks, chunk_frames, height, width, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    for _ in range(chunks):
+        shifts = rng.integers(-3, 4, chunk_frames + 1)
+        yield np.stack([np.roll(base, shift, axis=1) for shift in shifts])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=64)
+    parser.add_argument('--chunk-frames', type=int, default=256)
+    parser.add_argument('--width', type=int, default=160)
+    parser.add_argument('--height', type=int, default=90)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--video', help="Optional video file for an end-to-end timing")
+    args = parser.parse_args()
+
+    chunks = list(synthetic_chunks(args.chunks, args.chunk_frames, args.height, args.width))
+    frames = args.chunks * args.chunk_frames
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        frame_analyzer.score_frame_chunk(chunk)
+    single = time.perf_counter() - start
+    print(f"1 core: {frames / single:,.0f} frames/s")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Warm the workers so process start-up is not timed
+        list(pool.map(frame_analyzer.score_frame_chunk, chunks[:args.workers]))
+        start = time.perf_counter()
+        list(pool.map(frame_analyzer.score_frame_chunk, chunks))
+        pooled = time.perf_counter() - start
+    print(
+        f"{args.workers} workers: {frames / pooled:,.0f} frames/s "
+        f"({frames / pooled / args.workers:,.0f} frames/s per core)"
+    )
+
+    if args.video:
+        import config
+        from highlight_generator import FrameSamplingBackend, get_frame_pool
+
+        config.HIGHLIGHT_FRAME_WORKERS = args.workers
+        backend = FrameSamplingBackend()
+        _, frame_count = frame_analyzer.probe_video(args.video)
+        get_frame_pool()
+        start = time.perf_counter()
+        key_moments = backend.analyze(args.video)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{args.video}: {len(key_moments)} key moments, {frame_count:,} frames in {elapsed:.2f}s "
+            f"({frame_count / elapsed / args.workers:,.0f} frames/s per core incl. decoding)"
+        )
+
+
+if __name__ == '__main__':
+    main()
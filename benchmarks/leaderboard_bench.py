@@ -0,0 +1,80 @@
+"""Latency benchmark for the fan leaderboard.
+
+Builds a leaderboard of simulated fans spread over five teams, then times
+rank lookups, top-K reads and point updates, plus a save/load round trip.
+
+    python benchmarks/leaderboard_bench.py [--fans 1000000] [--queries 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import Leaderboard
+
+TEAMS = ['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants']
+
+
+def per_call_us(elapsed, calls):
+    return elapsed / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fans', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entries = {
+        f"fan{index:07d}": (rng.randrange(0, 5000), rng.choice(TEAMS))
+        for index in range(args.fans)
+    }
+
+    start = time.perf_counter()
+    leaderboard = Leaderboard(entries)
+    print(f"build {args.fans:,} fans: {time.perf_counter() - start:.2f}s")
+
+    fan_ids = rng.sample(list(entries), args.queries)
+
+    start = time.perf_counter()
+    for fan_id in fan_ids:
+        leaderboard.rank(fan_id)
+    print(f"rank: {per_call_us(time.perf_counter() - start, args.queries):.1f} us/query")
+
+    start = time.perf_counter()
+    for fan_id in fan_ids:
+        leaderboard.rank(fan_id, entries[fan_id][1])
+    print(f"team rank: {per_call_us(time.perf_counter() - start, args.queries):.1f} us/query")
+
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        leaderboard.top(10)
+    print(f"top 10: {per_call_us(time.perf_counter() - start, args.queries):.1f} us/query")
+
+    start = time.perf_counter()
+    for fan_id in fan_ids:
+        points, team = entries[fan_id]
+        leaderboard.update(fan_id, points + rng.randrange(1, 50), team)
+    print(f"update: {per_call_us(time.perf_counter() - start, args.queries):.1f} us/call")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'leaderboard.json.gz')
+        start = time.perf_counter()
+        leaderboard.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        Leaderboard.load(path)
+        print(
+            f"save {saved:.2f}s, load {time.perf_counter() - start:.2f}s "
+            f"({os.path.getsize(path) / 1e6:.1f} MB)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Settlement benchmark for the fan prediction book.
+
+Places random home/away picks from many fans on one scheduled game, marks
+the game Final through MLBDataStore.apply_events and times the settlement
+triggered by the store listener, then the per-fan collection of results.
+
+    python benchmarks/prediction_settlement_bench.py [--picks 500000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processor import MLBDataStore
+from predictions import PredictionBook
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--picks', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    store = MLBDataStore(ttl_seconds=0, seed=args.seed)
+    games = store.snapshot().processor.games_df
+    game_id = int(games['game_id'].iloc[-1])
+
+    book = PredictionBook()
+    timings = {}
+
+    def settle(snapshot, changed):
+        start = time.perf_counter()
+        timings['settlements'] = book.settle_final_games(snapshot.processor.games_df, changed)
+        timings['settle'] = time.perf_counter() - start
+
+    store.add_listener(settle)
+
+    sides = np.random.default_rng(args.seed).integers(0, 2, args.picks)
+    start = time.perf_counter()
+    for fan, side in enumerate(sides.tolist()):
+        book.place(f"fan{fan}", game_id, ('home', 'away')[side])
+    print(f"place {args.picks:,} picks: {time.perf_counter() - start:.2f}s")
+
+    store.apply_events([
+        {'game_id': game_id, 'type': 'score', 'home_score': 5, 'away_score': 3},
+        {'game_id': game_id, 'type': 'status', 'status': 'Final'}
+    ])
+    settlement = timings['settlements'][0]
+    print(
+        f"settle {settlement.picks:,} picks ({settlement.correct:,} correct): "
+        f"{timings['settle'] * 1000:.1f} ms"
+    )
+
+    start = time.perf_counter()
+    awarded = sum(book.collect(f"fan{fan}").points for fan in range(args.picks))
+    elapsed = time.perf_counter() - start
+    print(f"collect: {elapsed / args.picks * 1e6:.2f} us/fan, {awarded:,} points awarded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Daily challenge scheduling.
+
+Each day's challenge pool is built once: a day-seeded sample of the
+general challenges plus the team and achievement challenges. A fan's
+challenge is picked from the pool entries that fit them by hashing
+(fan_id, day), so it stays the same all day on every rerun and replica,
+and ChallengeScheduler.complete pays each fan's challenge at most once.
+"""
+import hashlib
+import random
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+from singleton import process_singleton
+
+GENERAL_CHALLENGES = [
+    {'task': 'Complete daily baseball trivia', 'points': 25},
+    {'task': 'Predict total runs in today\'s games', 'points': 35},
+    {'task': 'Create a game day prediction', 'points': 40},
+    {'task': 'Analyze a player\'s performance', 'points': 45},
+    {'task': 'Compare two teams in the Live Dashboard', 'points': 25},
+    {'task': 'Find today\'s exit velocity leader', 'points': 30},
+    {'task': 'Read three stories in the News Feed', 'points': 20}
+]
+
+TEAM_CHALLENGES = [
+    {'task': 'Watch a full {team} game', 'points': 50},
+    {'task': 'Predict the winner of next {team} game', 'points': 30},
+    {'task': 'Share {team} highlights on social media', 'points': 20}
+]
+
+# Offered while the achievement counter is below its badge threshold
+ACHIEVEMENT_CHALLENGES = [
+    ('video_analyses_watched', 10, {'task': 'Watch a video analysis of today\'s game', 'points': 15}),
+    ('player_profiles_viewed', 20, {'task': 'View 3 new player profiles', 'points': 15}),
+    ('social_shares', 5, {'task': 'Share your favorite player stats', 'points': 20})
+]
+
+# General challenges drawn into each day's pool
+GENERAL_PER_DAY = 4
+
+
+def _digest(*parts):
+    return int.from_bytes(hashlib.sha256(':'.join(map(str, parts)).encode()).digest()[:8], 'big')
+
+
+class ChallengeScheduler:
+    """Per-day challenge pools, deterministic assignment and pay-once completion"""
+
+    def __init__(self, general_per_day=GENERAL_PER_DAY):
+        self.general_per_day = general_per_day
+        self._completed = {}
+        self._latest = None
+        self._lock = threading.Lock()
+        # Pools and candidate lists are pure functions of their arguments
+        self.pool = lru_cache(maxsize=8)(self._build_pool)
+        self._candidates = lru_cache(maxsize=256)(self._build_candidates)
+
+    def _build_pool(self, day):
+        """Today's general challenges, drawn once with a day-seeded RNG"""
+        rng = random.Random(_digest('pool', day))
+        count = min(self.general_per_day, len(GENERAL_CHALLENGES))
+        return tuple(rng.sample(GENERAL_CHALLENGES, count))
+
+    def _build_candidates(self, day, team, needs):
+        candidates = []
+        if team:
+            candidates.extend(
+                {'task': challenge['task'].format(team=team), 'points': challenge['points']}
+                for challenge in TEAM_CHALLENGES
+            )
+        candidates.extend(
+            challenge for counter, _, challenge in ACHIEVEMENT_CHALLENGES if counter in needs
+        )
+        candidates.extend(self.pool(day))
+        return tuple(candidates)
+
+    def assign(self, fan_id, day, team=None, achievements=None):
+        """The fan's challenge for a day
+
+        Args:
+            team: Favorite team, enabling the team challenges
+            achievements: Achievement counters; challenges for badges not yet
+                earned are offered
+        """
+        achievements = achievements or {}
+        needs = frozenset(
+            counter for counter, threshold, _ in ACHIEVEMENT_CHALLENGES
+            if achievements.get(counter, 0) < threshold
+        )
+        candidates = self._candidates(day, team, needs)
+        return dict(candidates[_digest(fan_id, day) % len(candidates)])
+
+    def complete(self, fan_id, day):
+        """True the first time a fan completes the challenge of a day"""
+        with self._lock:
+            if self._completed.get(fan_id) == day:
+                return False
+            self._completed[fan_id] = day
+            if self._latest is None or day > self._latest:
+                self._latest = day
+                self._prune((date.fromisoformat(day) - timedelta(days=1)).isoformat())
+            return True
+
+    def _prune(self, oldest):
+        # ISO dates order as strings; fans in time zones behind can still be on yesterday
+        self._completed = {fan_id: done for fan_id, done in self._completed.items() if done >= oldest}
+
+
+@process_singleton
+def get_challenge_scheduler():
+    """Process-wide challenge scheduler, built on first use"""
+    return ChallengeScheduler()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_str(name, default):
+    value = os.environ.get(name)
+    return value if value else default
+
+
+# Seconds before the shared MLB data store re-reads its games file and event store (0 disables TTL refresh)
+DATA_TTL_SECONDS = _env_int('FAN_HUB_DATA_TTL_SECONDS', 300)
+
+# Optional games file (CSV or JSON records) loaded in place of the simulated games; reloaded when it changes
+DATA_SOURCE_PATH = _env_str('FAN_HUB_DATA_SOURCE_PATH', None)
+
+# Seed for the simulated data so every session sees the same league
+DATA_SEED = _env_int('FAN_HUB_DATA_SEED', 2025)
+
+# Directory of the memory-mapped pitch-by-pitch event store (unset disables it)
+EVENT_STORE_PATH = _env_str('FAN_HUB_EVENT_STORE_PATH', None)
+
+# Maximum number of Plotly figures kept in the shared chart cache
+FIGURE_CACHE_SIZE = _env_int('FAN_HUB_FIGURE_CACHE_SIZE', 64)
+
+# Render only the selected section instead of every tab body on each rerun
+LAZY_TABS = _env_bool('FAN_HUB_LAZY_TABS', False)
+
+# Highlight analyzer backend: 'video_intelligence' (Google Cloud), 'frame_sampling'
+# (local OpenCV frame differencing) or 'stub' (offline placeholder)
+HIGHLIGHT_BACKEND = _env_str('FAN_HUB_HIGHLIGHT_BACKEND', 'video_intelligence')
+
+# Regional Vertex AI endpoint used by the prediction client
+VERTEX_AI_ENDPOINT = _env_str('FAN_HUB_VERTEX_AI_ENDPOINT', 'us-central1-aiplatform.googleapis.com')
+
+# Directory where uploaded videos wait for background analysis
+HIGHLIGHT_SPOOL_DIR = _env_str('FAN_HUB_HIGHLIGHT_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'fan-hub-uploads'))
+
+# Highlight analyses allowed to run at once, and to be queued or running in total
+HIGHLIGHT_WORKERS = _env_int('FAN_HUB_HIGHLIGHT_WORKERS', 2)
+HIGHLIGHT_MAX_PENDING = _env_int('FAN_HUB_HIGHLIGHT_MAX_PENDING', 20)
+
+# Seconds between progress polls of a running highlight analysis
+HIGHLIGHT_POLL_SECONDS = _env_int('FAN_HUB_HIGHLIGHT_POLL_SECONDS', 2)
+
+# Disk cache of highlight results keyed by video content and analysis parameters
+HIGHLIGHT_CACHE_DIR = _env_str('FAN_HUB_HIGHLIGHT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'fan-hub-highlight-cache'))
+HIGHLIGHT_CACHE_TTL_SECONDS = _env_int('FAN_HUB_HIGHLIGHT_CACHE_TTL_SECONDS', 7 * 24 * 3600)
+HIGHLIGHT_CACHE_MAX_MB = _env_int('FAN_HUB_HIGHLIGHT_CACHE_MAX_MB', 64)
+
+# Chunk size used to stream uploads to the spool directory and to Cloud Storage
+HIGHLIGHT_SPOOL_CHUNK_BYTES = _env_int('FAN_HUB_HIGHLIGHT_SPOOL_CHUNK_BYTES', 8 * 1024 * 1024)
+
+# Cloud Storage bucket for staging uploads; without it videos are sent inline up to HIGHLIGHT_MAX_INLINE_MB
+HIGHLIGHT_GCS_BUCKET = _env_str('FAN_HUB_HIGHLIGHT_GCS_BUCKET', None)
+HIGHLIGHT_MAX_INLINE_MB = _env_int('FAN_HUB_HIGHLIGHT_MAX_INLINE_MB', 100)
+
+# Frame sampling analyzer: decode every Nth frame and score chunks on this many processes
+HIGHLIGHT_FRAME_STRIDE = _env_int('FAN_HUB_HIGHLIGHT_FRAME_STRIDE', 5)
+HIGHLIGHT_FRAME_WORKERS = _env_int('FAN_HUB_HIGHLIGHT_FRAME_WORKERS', max(1, (os.cpu_count() or 2) - 1))
+
+# Output of highlight_batch.py shown in the Highlights section (unset hides it)
+HIGHLIGHT_PRECOMPUTED_PATH = _env_str('FAN_HUB_HIGHLIGHT_PRECOMPUTED_PATH', None)
+
+# ffmpeg / ffprobe executables used to cut highlight reels
+FFMPEG_BINARY = _env_str('FAN_HUB_FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = _env_str('FAN_HUB_FFPROBE_BINARY', 'ffprobe')
+
+# Fan profile storage: 'sqlite' (local database file) or 'memory' (lost on restart)
+FAN_STORE_BACKEND = _env_str('FAN_HUB_FAN_STORE_BACKEND', 'sqlite')
+FAN_STORE_PATH = _env_str('FAN_HUB_FAN_STORE_PATH', os.path.join(tempfile.gettempdir(), 'fan-hub-fans.sqlite3'))
+
+# Seconds between batched writes of fan profile changes
+FAN_STORE_FLUSH_SECONDS = _env_int('FAN_HUB_FAN_STORE_FLUSH_SECONDS', 2)
+
+# Recent activities kept per fan, and days of daily rollups kept for older ones
+ACTIVITY_LOG_SIZE = _env_int('FAN_HUB_ACTIVITY_LOG_SIZE', 200)
+ACTIVITY_ROLLUP_DAYS = _env_int('FAN_HUB_ACTIVITY_ROLLUP_DAYS', 90)
+
+# File the fan leaderboard is saved to, and seconds between saves while it changes
+LEADERBOARD_PATH = _env_str('FAN_HUB_LEADERBOARD_PATH', os.path.join(tempfile.gettempdir(), 'fan-hub-leaderboard.json.gz'))
+LEADERBOARD_SAVE_SECONDS = _env_int('FAN_HUB_LEADERBOARD_SAVE_SECONDS', 30)
+
+# File fan predictions are saved to, and seconds between saves while they change
+PREDICTIONS_PATH = _env_str('FAN_HUB_PREDICTIONS_PATH', os.path.join(tempfile.gettempdir(), 'fan-hub-predictions.json.gz'))
+PREDICTIONS_SAVE_SECONDS = _env_int('FAN_HUB_PREDICTIONS_SAVE_SECONDS', 30)
+
+# Time zone whose calendar days count for daily streaks when the browser's is unknown
+FAN_TIMEZONE = _env_str('FAN_HUB_FAN_TIMEZONE', 'America/New_York')
+
+# Engagement event log, replayed on start and compacted into a checkpoint as it grows
+ENGAGEMENT_LOG_PATH = _env_str('FAN_HUB_ENGAGEMENT_LOG_PATH', os.path.join(tempfile.gettempdir(), 'fan-hub-engagement.jsonl'))
+
+# Seconds between batches of the engagement aggregator
+ENGAGEMENT_FLUSH_SECONDS = _env_int('FAN_HUB_ENGAGEMENT_FLUSH_SECONDS', 1)
+
+# News sources polled by the shared news store: comma-separated 'sample' and/or 'file'
+NEWS_SOURCES = _env_str('FAN_HUB_NEWS_SOURCES', 'sample')
+NEWS_FILE_PATH = _env_str('FAN_HUB_NEWS_FILE_PATH', None)
+
+# Seconds between news refreshes (0 fills once), and news items kept
+NEWS_REFRESH_SECONDS = _env_int('FAN_HUB_NEWS_REFRESH_SECONDS', 60)
+NEWS_MAX_ITEMS = _env_int('FAN_HUB_NEWS_MAX_ITEMS', 200)
@@ -1,14 +1,112 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import logging
+import os
 import random
+import threading
+import time
+from collections import namedtuple
+
+import config
+from event_store import PitchEventStore
+from predictions import get_prediction_book
+from singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+METRIC_COLUMNS = ['pitch_velocity', 'exit_velocity', 'launch_angle', 'spin_rate', 'distance']
+
+GAME_STATUSES = ('Scheduled', 'Live', 'Final')
+
+# Columns a games source file must provide (see MLBDataProcessor.load_games)
+GAME_SOURCE_COLUMNS = ('game_id', 'home_team', 'away_team', 'home_score', 'away_score', 'status')
+
+# Fields each live game event type is allowed to update
+GAME_EVENT_FIELDS = {
+    'score': ('home_score', 'away_score'),
+    'status': ('status',),
+    'metrics': tuple(METRIC_COLUMNS),
+    'highlight': ('highlights',)
+}
+
+FIELD_EVENT_TYPES = {field: event_type for event_type, fields in GAME_EVENT_FIELDS.items() for field in fields}
+
+# Real-time insight rules, evaluated in order. 'above' is a strict lower bound,
+# 'between' an inclusive range and 'nonempty' matches any non-blank text.
+INSIGHT_RULES = [
+    {'column': 'pitch_velocity', 'above': 98,
+     'template': "🔥 Elite velocity detected: {value:.1f} mph! Top 1% of all pitches!"},
+    {'column': 'exit_velocity', 'above': 110,
+     'template': "💥 Monster hit with exit velocity: {value:.1f} mph! Potential home run!"},
+    {'column': 'launch_angle', 'between': (25, 35),
+     'template': "📈 Perfect launch angle: {value:.1f}° - Optimal for home runs!"},
+    {'column': 'spin_rate', 'above': 2800,
+     'template': "🌪️ Elite spin rate: {value:.0f} RPM - Exceptional movement!"},
+    {'column': 'distance', 'above': 420,
+     'template': "🚀 Massive shot! Projected distance: {value:.1f} feet!"},
+    {'column': 'highlights', 'nonempty': True,
+     'template': "⚡ {value}"},
+]
+
+
+def _evaluate_rule(rule, values):
+    """Return a boolean mask of the values matching an insight rule"""
+    if 'above' in rule:
+        return values > rule['above']
+    if 'between' in rule:
+        low, high = rule['between']
+        return (values >= low) & (values <= high)
+    if 'nonempty' in rule:
+        return values != ''
+    raise ValueError(f"Insight rule for {rule['column']} has no condition")
+
 
 class MLBDataProcessor:
-    def __init__(self):
+    def __init__(self, seed=None, event_store=None, games_path=None):
+        self.rng = np.random.default_rng(seed)
+        self.py_rng = random.Random(seed)
+        self.event_store = event_store
         # Generate engaging sample player data
         self.generate_sample_data()
+        if games_path:
+            self.load_games(games_path)
+
+    def load_games(self, path):
+        """Replace the simulated games with a CSV or JSON (records) file
+
+        The file needs game_id, home_team, away_team, home_score, away_score
+        and status columns; metric columns and highlights are optional.
+        """
+        if path.endswith('.json'):
+            games = pd.read_json(path, orient='records')
+        else:
+            games = pd.read_csv(path, keep_default_na=False)
+
+        missing = [column for column in GAME_SOURCE_COLUMNS if column not in games.columns]
+        if missing:
+            raise ValueError(f"Games file {path} is missing columns: {', '.join(missing)}")
+        unknown = set(games['status']) - set(GAME_STATUSES)
+        if unknown:
+            raise ValueError(f"Unknown game status in {path}: {', '.join(map(str, sorted(unknown)))}")
+
+        games = games.copy()
+        for column in METRIC_COLUMNS:
+            values = games[column] if column in games.columns else np.nan
+            games[column] = pd.Series(values, index=games.index, dtype=np.float32)
+        if 'highlights' not in games.columns:
+            games['highlights'] = ''
+        games['highlights'] = games['highlights'].fillna('').astype(str)
+        games['version'] = np.zeros(len(games), dtype=np.int64)
+        self.games_df = games[list(GAME_SOURCE_COLUMNS) + METRIC_COLUMNS + ['highlights', 'version']]
+
+        self._build_indexes()
+        self._insight_cache = {}
 
     def generate_sample_data(self):
+        rng = self.rng
+        py_rng = self.py_rng
+
         # Generate engaging sample player data
         player_achievements = [
             'Led the league in OPS+ for 3 consecutive seasons',
@@ -41,12 +139,12 @@ class MLBDataProcessor:
                 'Mike Trout', 'Shohei Ohtani', 'Juan Soto', 'Mookie Betts', 'Aaron Judge',
                 'Ronald Acuña Jr.', 'Freddie Freeman', 'Trea Turner', 'Carlos Correa', 'Pete Alonso'
             ] + [f'Player {i}' for i in range(11, 101)],
-            'team': np.random.choice(['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants'], 100),
-            'position': np.random.choice(['P', 'C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF'], 100),
-            'avg': np.random.uniform(0.250, 0.380, 100).round(3),
-            'hr': np.random.randint(5, 52, 100),
-            'rbi': np.random.randint(20, 135, 100),
-            'story': player_achievements + [f'Career highlight: {random.choice(career_highlights)}' for _ in range(90)],
+            'team': rng.choice(['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants'], 100),
+            'position': rng.choice(['P', 'C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF'], 100),
+            'avg': rng.uniform(0.250, 0.380, 100).round(3),
+            'hr': rng.integers(5, 52, 100),
+            'rbi': rng.integers(20, 135, 100),
+            'story': player_achievements + [f'Career highlight: {py_rng.choice(career_highlights)}' for _ in range(90)],
             'video_highlights': [
                 [
                     "Spectacular diving catch",
@@ -61,32 +159,57 @@ class MLBDataProcessor:
         # Generate exciting game data with video analysis
         self.games_df = pd.DataFrame({
             'game_id': range(1, 51),
-            'home_team': np.random.choice(['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants'], 50),
-            'away_team': np.random.choice(['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants'], 50),
-            'home_score': np.random.randint(0, 12, 50),
-            'away_score': np.random.randint(0, 12, 50),
-            'status': ['Live' if i < 3 else np.random.choice(['Final', 'Scheduled'], p=[0.7, 0.3]) for i in range(50)],
-            'video_metrics': [
-                {
-                    'pitch_velocity': round(np.random.uniform(88, 103), 1),
-                    'exit_velocity': round(np.random.uniform(85, 118), 1),
-                    'launch_angle': round(np.random.uniform(10, 45), 1),
-                    'spin_rate': round(np.random.uniform(2000, 3000), 0),
-                    'distance': round(np.random.uniform(300, 450), 1)
-                } for _ in range(50)
-            ],
+            'home_team': rng.choice(['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants'], 50),
+            'away_team': rng.choice(['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants'], 50),
+            'home_score': rng.integers(0, 12, 50),
+            'away_score': rng.integers(0, 12, 50),
+            'status': ['Live' if i < 3 else rng.choice(['Final', 'Scheduled'], p=[0.7, 0.3]) for i in range(50)],
+            # Video metrics are stored as flat float32 columns (see METRIC_COLUMNS)
+            'pitch_velocity': rng.uniform(88, 103, 50).round(1).astype(np.float32),
+            'exit_velocity': rng.uniform(85, 118, 50).round(1).astype(np.float32),
+            'launch_angle': rng.uniform(10, 45, 50).round(1).astype(np.float32),
+            'spin_rate': rng.uniform(2000, 3000, 50).round(0).astype(np.float32),
+            'distance': rng.uniform(300, 450, 50).round(1).astype(np.float32),
             'highlights': [
-                random.choice([
+                py_rng.choice([
                     "Perfect game through 7 innings!",
                     "Back-to-back home runs in the 9th!",
                     "Triple play alert!",
                     "Immaculate inning achieved!",
                     "Four stolen bases in one inning!",
                     "No-hitter alert in progress!"
-                ]) if random.random() < 0.3 else "" for _ in range(50)
-            ]
+                ]) if py_rng.random() < 0.3 else "" for _ in range(50)
+            ],
+            # Bumped by apply_events so consumers can recompute only changed games
+            'version': np.zeros(50, dtype=np.int64)
         })
 
+        self._build_indexes()
+        self._insight_cache = {}
+
+    def _build_indexes(self):
+        """Build primary-key indexes mapping IDs to row positions"""
+        self._player_index = pd.Index(self.players_df['player_id'])
+        self._game_index = pd.Index(self.games_df['game_id'])
+        if not self._player_index.is_unique:
+            raise ValueError("players_df contains duplicate player_id values")
+        if not self._game_index.is_unique:
+            raise ValueError("games_df contains duplicate game_id values")
+
+    def _player_row(self, player_id):
+        try:
+            position = self._player_index.get_loc(player_id)
+        except KeyError:
+            raise KeyError(f"Unknown player_id: {player_id}") from None
+        return self.players_df.iloc[position]
+
+    def _game_row(self, game_id):
+        try:
+            position = self._game_index.get_loc(game_id)
+        except KeyError:
+            raise KeyError(f"Unknown game_id: {game_id}") from None
+        return self.games_df.iloc[position]
+
     def get_top_players(self, stat='avg', n=10):
         return self.players_df.nlargest(n, stat)
 
@@ -94,7 +217,7 @@ class MLBDataProcessor:
         return self.games_df[self.games_df['status'] == 'Live']
 
     def get_player_stats(self, player_id):
-        player_data = self.players_df[self.players_df['player_id'] == player_id].iloc[0]
+        player_data = self._player_row(player_id)
         return {
             'basic_stats': {
                 'avg': player_data['avg'],
@@ -106,7 +229,7 @@ class MLBDataProcessor:
         }
 
     def get_game_video_analysis(self, game_id):
-        game = self.games_df[self.games_df['game_id'] == game_id].iloc[0]
+        game = self._game_row(game_id)
         return {
             'game_info': {
                 'home_team': game['home_team'],
@@ -114,29 +237,187 @@ class MLBDataProcessor:
                 'score': f"{game['home_score']} - {game['away_score']}",
                 'highlight': game['highlights']
             },
-            'video_metrics': game['video_metrics']
+            'video_metrics': self._metrics_dict(game)
         }
 
+    def get_video_metrics(self, game_id):
+        """Return a game's video metrics in the legacy dict shape"""
+        return self._metrics_dict(self._game_row(game_id))
+
+    def _metrics_dict(self, game):
+        # float32 storage; round back to the one-decimal precision of the source data
+        return {column: round(float(game[column]), 1) for column in METRIC_COLUMNS}
+
+    def get_league_metric_averages(self):
+        """League-wide mean of every video metric"""
+        means = self.games_df[METRIC_COLUMNS].mean()
+        return {column: round(float(means[column]), 1) for column in METRIC_COLUMNS}
+
+    def get_metric_percentiles(self, percentiles=(0.25, 0.5, 0.75, 0.9, 0.99)):
+        """Percentile table of every video metric, one row per percentile"""
+        return self.games_df[METRIC_COLUMNS].quantile(list(percentiles))
+
+    def get_metric_leaders(self, metric='exit_velocity', n=10):
+        """Games with the highest values of a video metric"""
+        if metric not in METRIC_COLUMNS:
+            raise KeyError(f"Unknown video metric: {metric}")
+        return self.games_df.nlargest(n, metric)[
+            ['game_id', 'home_team', 'away_team', metric]
+        ]
+
     def get_real_time_insights(self, game_id):
         """Get AI-powered real-time insights for a game"""
-        game = self.games_df[self.games_df['game_id'] == game_id].iloc[0]
-        metrics = game['video_metrics']
-
-        insights = []
-        if metrics['pitch_velocity'] > 98:
-            insights.append(f"🔥 Elite velocity detected: {metrics['pitch_velocity']} mph! Top 1% of all pitches!")
-        if metrics['exit_velocity'] > 110:
-            insights.append(f"💥 Monster hit with exit velocity: {metrics['exit_velocity']} mph! Potential home run!")
-        if 25 <= metrics['launch_angle'] <= 35:
-            insights.append(f"📈 Perfect launch angle: {metrics['launch_angle']}° - Optimal for home runs!")
-        if metrics['spin_rate'] > 2800:
-            insights.append(f"🌪️ Elite spin rate: {metrics['spin_rate']} RPM - Exceptional movement!")
-        if metrics['distance'] > 420:
-            insights.append(f"🚀 Massive shot! Projected distance: {metrics['distance']} feet!")
-        if game['highlights']:
-            insights.append(f"⚡ {game['highlights']}")
-
-        return insights
+        return self.get_live_insights([game_id])[game_id]
+
+    def get_live_insights(self, game_ids=None):
+        """Evaluate INSIGHT_RULES for many games in one vectorized pass
+
+        Args:
+            game_ids: IDs of the games to evaluate, defaults to every live game
+
+        Returns:
+            Dict mapping game_id to its list of insight strings
+        """
+        if game_ids is None:
+            games = self.get_live_games()
+        else:
+            positions = self._game_index.get_indexer(game_ids)
+            if (positions < 0).any():
+                missing = [gid for gid, pos in zip(game_ids, positions) if pos < 0]
+                raise KeyError(f"Unknown game_id: {missing[0]}")
+            games = self.games_df.iloc[positions]
+
+        # Only re-evaluate games whose version changed since they were last cached
+        versions = games['version'].to_numpy()
+        cached = [
+            self._insight_cache.get(game_id, (-1, None))[0] == version
+            for game_id, version in zip(games['game_id'].tolist(), versions.tolist())
+        ]
+        stale = games[~np.asarray(cached, dtype=bool)]
+        if not stale.empty:
+            self._insight_cache.update(self._evaluate_insights(stale))
+
+        return {
+            game_id: list(self._insight_cache[game_id][1])
+            for game_id in games['game_id'].tolist()
+        }
+
+    def _evaluate_insights(self, games):
+        """Run every insight rule over a frame of games, keyed by game_id"""
+        ids = games['game_id'].tolist()
+        insights = {game_id: [] for game_id in ids}
+        ids = np.asarray(ids)
+
+        for rule in INSIGHT_RULES:
+            values = games[rule['column']].to_numpy()
+            mask = _evaluate_rule(rule, values)
+            for game_id, value in zip(ids[mask].tolist(), values[mask].tolist()):
+                insights[game_id].append(rule['template'].format(value=value))
+
+        versions = games['version'].tolist()
+        return {
+            game_id: (version, tuple(insights[game_id]))
+            for game_id, version in zip(ids.tolist(), versions)
+        }
+
+    def apply_events(self, events):
+        """Apply a stream of live game events as in-place deltas
+
+        Args:
+            events: Iterable of dicts with a 'game_id', a 'type' from
+                GAME_EVENT_FIELDS and the fields that type updates, e.g.
+                {'game_id': 3, 'type': 'score', 'home_score': 4}
+
+        Returns:
+            Set of game_ids whose version was bumped
+        """
+        updates = {}
+        for event in events:
+            event_type = event.get('type')
+            if event_type not in GAME_EVENT_FIELDS:
+                raise ValueError(f"Unknown game event type: {event_type}")
+            game_id = event['game_id']
+            try:
+                position = self._game_index.get_loc(game_id)
+            except KeyError:
+                raise KeyError(f"Unknown game_id: {game_id}") from None
+            if event_type == 'status' and event.get('status') not in GAME_STATUSES:
+                raise ValueError(f"Unknown game status: {event.get('status')}")
+
+            for field in GAME_EVENT_FIELDS[event_type]:
+                if field in event:
+                    # Later events in the batch win over earlier ones
+                    updates[(position, field)] = event[field]
+
+        if not updates:
+            return set()
+
+        by_column = {}
+        for (position, field), value in updates.items():
+            by_column.setdefault(field, ([], []))
+            by_column[field][0].append(position)
+            by_column[field][1].append(value)
+
+        # Cast every column before writing any, so a bad value leaves games_df untouched
+        columns = [
+            (self.games_df.columns.get_loc(field), positions, self._event_values(field, values))
+            for field, (positions, values) in by_column.items()
+        ]
+        for column, positions, values in columns:
+            self.games_df.iloc[positions, column] = values
+
+        changed = np.unique([position for position, _ in updates])
+        version_column = self.games_df.columns.get_loc('version')
+        self.games_df.iloc[changed, version_column] = self.games_df['version'].to_numpy()[changed] + 1
+        return set(self.games_df['game_id'].to_numpy()[changed].tolist())
+
+    def _event_values(self, field, values):
+        """Event values cast to the dtype of their games_df column"""
+        if field in METRIC_COLUMNS:
+            try:
+                return np.asarray(values, dtype=self.games_df[field].dtype)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {field} value in {values}") from None
+        if field in ('home_score', 'away_score'):
+            for value in values:
+                if isinstance(value, bool) or not isinstance(value, (int, np.integer)) or value < 0:
+                    raise ValueError(f"Invalid {field} value: {value!r}")
+            return np.asarray(values, dtype=self.games_df[field].dtype)
+        return [str(value) for value in values]
+
+    def get_game_versions(self):
+        """Current version counter of every game, keyed by game_id"""
+        return dict(zip(self.games_df['game_id'].tolist(), self.games_df['version'].tolist()))
+
+    def changed_since(self, versions):
+        """game_ids whose version differs from a previously seen get_game_versions() result"""
+        return {
+            game_id for game_id, version in self.get_game_versions().items()
+            if versions.get(game_id) != version
+        }
+
+    def copy(self):
+        """Independent copy whose games can be updated without touching this one"""
+        clone = object.__new__(MLBDataProcessor)
+        clone.__dict__.update(self.__dict__)
+        clone.games_df = self.games_df.copy()
+        clone._insight_cache = dict(self._insight_cache)
+        return clone
+
+    def get_game_pitches(self, game_id, columns=None):
+        """Pitch-by-pitch events of a game from the attached event store"""
+        self._game_row(game_id)
+        return self._require_event_store().game_events(game_id, columns)
+
+    def get_player_pitches(self, player_id, role='pitcher', columns=None):
+        """Pitches thrown or faced by a player from the attached event store"""
+        self._player_row(player_id)
+        return self._require_event_store().player_events(player_id, role, columns)
+
+    def _require_event_store(self):
+        if self.event_store is None:
+            raise RuntimeError("No pitch event store is attached to this MLBDataProcessor")
+        return self.event_store
 
     def get_team_stats(self, team_name):
         team_players = self.players_df[self.players_df['team'] == team_name]
@@ -144,4 +425,171 @@ class MLBDataProcessor:
             'avg_batting': team_players['avg'].mean().round(3),
             'total_hr': team_players['hr'].sum(),
             'total_rbi': team_players['rbi'].sum()
-        }
\ No newline at end of file
+        }
+
+
+DataSnapshot = namedtuple('DataSnapshot', ['version', 'built_at', 'processor'])
+
+
+class MLBDataStore:
+    """Process-wide holder of versioned MLBDataProcessor snapshots.
+
+    A snapshot is built once and shared by every session. Published snapshots
+    are never mutated; a refresh builds a new processor and swaps it in, so
+    readers holding an older snapshot keep a consistent view. The latest value
+    of every field set by a live event is kept as an overlay and re-applied
+    after each rebuild.
+    """
+
+    def __init__(self, ttl_seconds=300, source_path=None, seed=None, event_store_path=None):
+        self.ttl_seconds = ttl_seconds
+        self.source_path = source_path
+        self.seed = seed
+        self.event_store_path = event_store_path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._source_mtime = None
+        # Source mtime whose load failed; retried on the next TTL tick or file change
+        self._failed_mtime = None
+        self._listeners = []
+        # (game_id, field) -> latest live event value
+        self._overlay = {}
+
+    def add_listener(self, callback):
+        """Call callback(snapshot, changed_game_ids) after games change
+
+        changed_game_ids is the set an apply_events batch changed, or None
+        after a rebuild, when any game may have changed.
+        """
+        self._listeners.append(callback)
+
+    def snapshot(self):
+        """Return the current snapshot, rebuilding it if stale"""
+        current = self._snapshot
+        if current is not None and not self._is_stale(current):
+            return current
+
+        with self._lock:
+            # Another session may have refreshed while we waited
+            current = self._snapshot
+            rebuilt = current is None or self._is_stale(current)
+            if rebuilt:
+                current = self._build(current)
+        if rebuilt:
+            self._notify(current, None)
+        return current
+
+    def refresh(self):
+        """Force a rebuild and return the new snapshot"""
+        with self._lock:
+            snapshot = self._build(self._snapshot)
+        self._notify(snapshot, None)
+        return snapshot
+
+    def apply_events(self, events):
+        """Apply live game events and publish them as a new snapshot
+
+        The current snapshot is left untouched; the events are applied to a
+        copy which then replaces it. The applied values survive TTL and source
+        refreshes.
+
+        Returns:
+            Tuple of (new snapshot, set of changed game_ids)
+        """
+        with self._lock:
+            current = self._snapshot or self._build(None)
+            processor = current.processor.copy()
+            events = list(events)
+            changed = processor.apply_events(events)
+            if not changed:
+                return current, changed
+            for event in events:
+                for field in GAME_EVENT_FIELDS[event['type']]:
+                    if field in event:
+                        self._overlay[(event['game_id'], field)] = event[field]
+            self._snapshot = current._replace(version=current.version + 1, processor=processor)
+            snapshot = self._snapshot
+        self._notify(snapshot, changed)
+        return snapshot, changed
+
+    def _notify(self, snapshot, changed):
+        # Called outside the lock so listeners may read the store
+        for callback in self._listeners:
+            callback(snapshot, changed)
+
+    @property
+    def version(self):
+        return self._snapshot.version if self._snapshot else 0
+
+    def _is_stale(self, snapshot):
+        mtime = self._read_source_mtime()
+        if mtime != self._source_mtime and mtime != self._failed_mtime:
+            return True
+        # Without a games file or event store a rebuild only re-simulates the league
+        if not (self.source_path or self.event_store_path):
+            return False
+        return bool(self.ttl_seconds) and time.monotonic() - snapshot.built_at >= self.ttl_seconds
+
+    def _read_source_mtime(self):
+        if not self.source_path:
+            return None
+        try:
+            return os.stat(self.source_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _open_event_store(self):
+        if not self.event_store_path:
+            return None
+        # Re-open on every build so segments appended since the last snapshot are visible
+        return PitchEventStore(self.event_store_path)
+
+    def _build(self, previous):
+        mtime = self._read_source_mtime()
+        version = previous.version + 1 if previous else 1
+        try:
+            processor = MLBDataProcessor(
+                seed=self.seed,
+                event_store=self._open_event_store(),
+                games_path=self.source_path
+            )
+        except (OSError, ValueError, KeyError):
+            if previous is None:
+                raise
+            # Keep serving the previous snapshot and retry after the TTL
+            logger.exception("Failed to load games from %s; keeping snapshot %d", self.source_path, previous.version)
+            self._failed_mtime = mtime
+            self._snapshot = previous._replace(built_at=time.monotonic())
+            return self._snapshot
+        # Only a successful load marks this version of the source as seen
+        self._source_mtime = mtime
+        self._failed_mtime = None
+        processor.apply_events(self._overlay_events(processor))
+        self._snapshot = DataSnapshot(version=version, built_at=time.monotonic(), processor=processor)
+        return self._snapshot
+
+    def _overlay_events(self, processor):
+        # Games dropped from the source take their live values with them
+        game_ids = processor._game_index
+        for (game_id, field), value in list(self._overlay.items()):
+            if game_id not in game_ids:
+                del self._overlay[(game_id, field)]
+                continue
+            yield {'game_id': game_id, 'type': FIELD_EVENT_TYPES[field], field: value}
+
+
+@process_singleton
+def get_data_store():
+    """Single data store shared by every session in this server process"""
+    store = MLBDataStore(
+        ttl_seconds=config.DATA_TTL_SECONDS,
+        source_path=config.DATA_SOURCE_PATH,
+        seed=config.DATA_SEED,
+        event_store_path=config.EVENT_STORE_PATH
+    )
+    # Settle fan predictions as soon as live events mark games Final
+    prediction_book = get_prediction_book()
+    store.add_listener(
+        lambda snapshot, changed: prediction_book.settle_final_games(snapshot.processor.games_df, changed)
+    )
+    return store
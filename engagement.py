@@ -0,0 +1,223 @@
+"""Engagement event bus.
+
+Tracking calls only put a small (timestamp, fan_id, action) event on an
+in-process queue. A background aggregator drains the queue in batches,
+appends each batch to a JSONL log, and folds it into per-fan pending
+counts and per-day rollups. Each fan's session collects its pending counts
+on its next run and applies points and badges from them; the collection is
+logged too. Replaying the log after a restart restores both the rollups and
+what fans have not collected yet. Every COMPACT_EVERY_EVENTS logged events
+the log is rewritten as a single checkpoint line, so it stays small.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+import config
+from singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# action -> (achievement counter, points per event, activity text)
+ENGAGEMENT_ACTIONS = {
+    'video_analysis': ('video_analyses_watched', 15, "Watched video analysis"),
+    'profile_view': ('player_profiles_viewed', 5, "Viewed player profile"),
+    'social_share': ('social_shares', 20, "Shared content on social media")
+}
+
+# Logged events (and collections) after which the log is compacted
+COMPACT_EVERY_EVENTS = 10_000
+
+# Days of daily rollups kept
+ROLLUP_DAYS = 30
+
+
+class EngagementBus:
+    """In-process queue of engagement events with a batching aggregator"""
+
+    def __init__(self, log_path=None, flush_seconds=1.0):
+        self.log_path = log_path
+        self.flush_seconds = flush_seconds
+        self.daily = {}
+        self._pending = {}
+        self._logged = 0
+        # Sequence number of the latest logged collect
+        self._collects = 0
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        if log_path:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(log_path):
+                self.replay(log_path)
+        self._thread = threading.Thread(target=self._run, name='engagement-aggregator', daemon=True)
+        self._thread.start()
+
+    def publish(self, fan_id, action):
+        """Queue one engagement event; never blocks on aggregation or I/O"""
+        if action not in ENGAGEMENT_ACTIONS:
+            raise ValueError(f"Unknown engagement action: {action}")
+        self._queue.put((time.time(), fan_id, action))
+
+    def collect(self, fan_id):
+        """Take the fan's aggregated but not yet applied events
+
+        Returns:
+            Dict of action -> event count, empty when nothing is pending
+        """
+        with self._lock:
+            counts = self._pending.pop(fan_id, {})
+            if counts:
+                self._collects += 1
+                collect = self._collects
+        if counts and self.log_path:
+            # Logged with the next batch so a replay does not hand them out again
+            self._queue.put((time.time(), fan_id, dict(counts), collect))
+        return counts
+
+    def daily_rollups(self, day=None):
+        """Event counts per action across all fans for a day (a date, defaulting to today)"""
+        with self._lock:
+            return dict(self.daily.get((day or date.today()).isoformat(), {}))
+
+    def flush(self):
+        """Aggregate and log everything queued so far"""
+        with self._flush_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return 0
+            # Aggregate before logging so a failed write never loses points
+            self._aggregate(event for event in batch if len(event) == 3)
+            if self.log_path:
+                with open(self.log_path, 'a') as f:
+                    f.write(''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in batch))
+                self._logged += len(batch)
+                if self._logged >= COMPACT_EVERY_EVENTS:
+                    self.compact()
+            return len(batch)
+
+    def compact(self):
+        """Replace the log with one checkpoint line holding the current state"""
+        with self._lock:
+            # Collects up to this sequence number are already reflected in the
+            # pending counts, even if their log line is still queued
+            checkpoint = {'pending': self._pending, 'daily': self.daily, 'collects': self._collects}
+            line = json.dumps({'checkpoint': checkpoint}, separators=(',', ':')) + '\n'
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(line)
+        # Atomic, so a crash leaves either the old log or the checkpoint
+        os.replace(tmp_path, self.log_path)
+        self._logged = 0
+
+    def replay(self, path):
+        """Restore pending counts and daily rollups from a log
+
+        A last line torn by a crash mid-write is dropped, and the file is cut
+        back to the last complete line so later appends start on a new line.
+        """
+        events = 0
+        checkpointed = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    good_end = f.tell() - len(line)
+                    if f.read().strip():
+                        raise
+                    logger.warning("Dropping torn last line of %s: %r", path, line[:80])
+                    os.truncate(path, good_end)
+                    break
+                if not line.endswith(b'\n'):
+                    # Complete record whose newline was not written
+                    with open(path, 'ab') as log:
+                        log.write(b'\n')
+                if isinstance(record, dict):
+                    checkpoint = record['checkpoint']
+                    with self._lock:
+                        self._pending = {fan_id: dict(counts) for fan_id, counts in checkpoint['pending'].items()}
+                        self.daily = {day: Counter(counts) for day, counts in checkpoint['daily'].items()}
+                    checkpointed = self._collects = checkpoint['collects']
+                    continue
+                if len(record) == 3:
+                    self._aggregate([record])
+                else:
+                    _, fan_id, counts, collect = record
+                    self._collects = max(self._collects, collect)
+                    if collect > checkpointed:
+                        self._uncollect(fan_id, counts)
+                events += 1
+        self._logged = events
+        return events
+
+    def _aggregate(self, batch):
+        # Count the batch first so shared state is touched once per fan and day
+        batch = list(batch)
+        per_fan = Counter((fan_id, action) for _, fan_id, action in batch)
+        per_day = Counter((date.fromtimestamp(timestamp).isoformat(), action) for timestamp, _, action in batch)
+        with self._lock:
+            for (fan_id, action), count in per_fan.items():
+                waiting = self._pending.setdefault(fan_id, {})
+                waiting[action] = waiting.get(action, 0) + count
+            for (day, action), count in per_day.items():
+                if day not in self.daily:
+                    self.daily[day] = Counter()
+                    if len(self.daily) > ROLLUP_DAYS:
+                        # ISO dates sort chronologically
+                        del self.daily[min(self.daily)]
+                self.daily[day][action] += count
+
+    def _uncollect(self, fan_id, counts):
+        # Replay of a logged collect: drop what the fan already received
+        with self._lock:
+            waiting = self._pending.get(fan_id, {})
+            for action, count in counts.items():
+                left = waiting.get(action, 0) - count
+                if left > 0:
+                    waiting[action] = left
+                else:
+                    waiting.pop(action, None)
+            if not waiting:
+                self._pending.pop(fan_id, None)
+
+    def close(self):
+        """Stop the aggregator and flush what is left"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception:
+                # Keep aggregating; the next interval drains whatever is queued by then
+                logger.exception("Engagement flush failed")
+
+
+@process_singleton
+def get_engagement_bus():
+    """Process-wide engagement bus, replaying config.ENGAGEMENT_LOG_PATH on first use"""
+    bus = EngagementBus(
+        log_path=config.ENGAGEMENT_LOG_PATH,
+        flush_seconds=config.ENGAGEMENT_FLUSH_SECONDS
+    )
+    atexit.register(bus.close)
+    return bus
@@ -0,0 +1,238 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends from one process only
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+# Column layout of a pitch event. Every segment stores one .npy file per column.
+PITCH_EVENT_COLUMNS = {
+    'game_id': np.int32,
+    'pitch_number': np.int16,
+    'inning': np.int8,
+    'pitcher_id': np.int32,
+    'batter_id': np.int32,
+    'pitch_velocity': np.float32,
+    'spin_rate': np.float32,
+    'exit_velocity': np.float32,
+    'launch_angle': np.float32,
+    'distance': np.float32
+}
+
+# Columns with a sorted secondary index for per-player slicing
+PLAYER_INDEX_COLUMNS = {
+    'pitcher': 'pitcher_id',
+    'batter': 'batter_id'
+}
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = 'manifest.lock'
+
+
+class PitchEventStore:
+    """Append-only columnar store of pitch-by-pitch events.
+
+    Each append writes an immutable segment directory holding one .npy file
+    per column, sorted by game_id, plus argsort indexes for pitcher and batter
+    IDs. Reads open the files with memory mapping so slicing a game or a
+    player only pages in the rows it touches, never the whole season.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._segments = self._read_manifest()
+        self._open = {}
+
+    def __len__(self):
+        return sum(segment['rows'] for segment in self._segments)
+
+    @property
+    def segments(self):
+        return list(self._segments)
+
+    def append(self, events):
+        """Append a batch of events as a new segment
+
+        Args:
+            events: DataFrame or dict of equal-length arrays with every
+                column in PITCH_EVENT_COLUMNS
+
+        Returns:
+            Name of the written segment
+        """
+        columns = {}
+        for column, dtype in PITCH_EVENT_COLUMNS.items():
+            if column not in events:
+                raise KeyError(f"Pitch events are missing column: {column}")
+            columns[column] = np.asarray(events[column], dtype=dtype)
+
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("Pitch event columns must all have the same length")
+        rows = lengths.pop()
+        if rows == 0:
+            return None
+
+        # Sort by game so per-game reads are a contiguous slice
+        order = np.argsort(columns['game_id'], kind='stable')
+        # Build the segment under a private name; it is only renamed into place once complete
+        segment_dir = tempfile.mkdtemp(prefix='.seg-', dir=self.root)
+
+        try:
+            for column, values in columns.items():
+                np.save(os.path.join(segment_dir, f"{column}.npy"), values[order])
+
+            for role, column in PLAYER_INDEX_COLUMNS.items():
+                keys = columns[column][order]
+                player_order = np.argsort(keys, kind='stable').astype(np.int32)
+                np.save(os.path.join(segment_dir, f"_{role}_order.npy"), player_order)
+                np.save(os.path.join(segment_dir, f"_{role}_keys.npy"), keys[player_order])
+
+            game_ids = columns['game_id']
+            with self._manifest_lock():
+                # Other stores on the same root may have appended since we last read it
+                segments = self._read_manifest()
+                name = self._next_segment_name(segments)
+                os.rename(segment_dir, os.path.join(self.root, name))
+                segments.append({
+                    'name': name,
+                    'rows': int(rows),
+                    'min_game_id': int(game_ids.min()),
+                    'max_game_id': int(game_ids.max())
+                })
+                self._write_manifest(segments)
+        except BaseException:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            raise
+        self._segments = segments
+        return name
+
+    def game_events(self, game_id, columns=None):
+        """Return every pitch of a game as a DataFrame"""
+        frames = []
+        for segment in self._segments:
+            if not segment['min_game_id'] <= game_id <= segment['max_game_id']:
+                continue
+            game_ids = self._array(segment, 'game_id')
+            start, stop = np.searchsorted(game_ids, [game_id, game_id + 1])
+            if start < stop:
+                frames.append(self._slice(segment, slice(start, stop), columns))
+        return self._concat(frames, columns)
+
+    def player_events(self, player_id, role='pitcher', columns=None):
+        """Return every pitch thrown (role='pitcher') or faced (role='batter') by a player"""
+        if role not in PLAYER_INDEX_COLUMNS:
+            raise ValueError(f"Unknown player role: {role}")
+        frames = []
+        for segment in self._segments:
+            keys = self._array(segment, f"_{role}_keys")
+            start, stop = np.searchsorted(keys, [player_id, player_id + 1])
+            if start < stop:
+                # Sorted positions keep the fancy-index reads moving forward through the file
+                rows = np.sort(self._array(segment, f"_{role}_order")[start:stop])
+                frames.append(self._slice(segment, rows, columns))
+        return self._concat(frames, columns)
+
+    def column(self, name):
+        """Memory-mapped arrays of one column, one per segment"""
+        if name not in PITCH_EVENT_COLUMNS:
+            raise KeyError(f"Unknown pitch event column: {name}")
+        return [self._array(segment, name) for segment in self._segments]
+
+    def close(self):
+        """Drop cached memory maps so their file handles can be released"""
+        self._open.clear()
+
+    def _array(self, segment, name):
+        key = (segment['name'], name)
+        array = self._open.get(key)
+        if array is None:
+            path = os.path.join(self.root, segment['name'], f"{name}.npy")
+            array = np.load(path, mmap_mode='r')
+            self._open[key] = array
+        return array
+
+    def _slice(self, segment, rows, columns):
+        names = columns or list(PITCH_EVENT_COLUMNS)
+        return pd.DataFrame({
+            name: np.asarray(self._array(segment, name)[rows]) for name in names
+        })
+
+    def _concat(self, frames, columns):
+        if not frames:
+            names = columns or list(PITCH_EVENT_COLUMNS)
+            return pd.DataFrame({
+                name: np.empty(0, dtype=PITCH_EVENT_COLUMNS[name]) for name in names
+            })
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def _next_segment_name(self, segments):
+        number = max((int(segment['name'][4:]) for segment in segments), default=0) + 1
+        # Skip directories left behind by an append that crashed before its manifest update
+        while os.path.exists(os.path.join(self.root, f"seg-{number:06d}")):
+            number += 1
+        return f"seg-{number:06d}"
+
+    @contextmanager
+    def _manifest_lock(self):
+        with open(os.path.join(self.root, LOCK_NAME), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        path = os.path.join(self.root, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)['segments']
+
+    def _write_manifest(self, segments):
+        path = os.path.join(self.root, MANIFEST_NAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'columns': list(PITCH_EVENT_COLUMNS), 'segments': segments}, f)
+        # Readers only ever see a complete manifest
+        os.replace(tmp_path, path)
+
+
+def simulate_pitch_events(games_df, players_df, pitches_per_game=300, seed=None):
+    """Generate Statcast-style pitch events for every game in games_df"""
+    rng = np.random.default_rng(seed)
+    n_games = len(games_df)
+    rows = n_games * pitches_per_game
+    player_ids = players_df['player_id'].to_numpy()
+    pitchers = players_df.loc[players_df['position'] == 'P', 'player_id'].to_numpy()
+    if len(pitchers) == 0:
+        pitchers = player_ids
+
+    # Roughly a third of pitches are put in play; the rest carry no batted-ball data
+    in_play = rng.random(rows) < 0.3
+    no_contact = np.float32(np.nan)
+
+    return {
+        'game_id': np.repeat(games_df['game_id'].to_numpy(), pitches_per_game),
+        'pitch_number': np.tile(np.arange(1, pitches_per_game + 1), n_games),
+        'inning': np.tile(np.arange(pitches_per_game) * 9 // pitches_per_game + 1, n_games),
+        'pitcher_id': rng.choice(pitchers, rows),
+        'batter_id': rng.choice(player_ids, rows),
+        'pitch_velocity': rng.uniform(78, 103, rows).round(1),
+        'spin_rate': rng.uniform(1800, 3100, rows).round(0),
+        'exit_velocity': np.where(in_play, rng.uniform(60, 118, rows).round(1), no_contact),
+        'launch_angle': np.where(in_play, rng.uniform(-30, 60, rows).round(1), no_contact),
+        'distance': np.where(in_play, rng.uniform(0, 460, rows).round(1), no_contact)
+    }
@@ -1,29 +1,103 @@
 import streamlit as st
-import random
-from datetime import datetime
+import uuid
+from datetime import date, datetime
+
+import config
+from activity_log import ActivityLog
+from badges import badge_engine
+from challenges import get_challenge_scheduler
+from engagement import ENGAGEMENT_ACTIONS, get_engagement_bus
+from fan_store import get_fan_store, profile_update
+from leaderboard import get_leaderboard
+from predictions import get_prediction_book
+from streaks import advance_streak, fan_today, get_streak_ledger
+
+DEFAULT_ACHIEVEMENTS = {
+    'games_watched': 0,
+    'predictions_made': 0,
+    'correct_predictions': 0,
+    'social_shares': 0,
+    'player_profiles_viewed': 0,
+    'video_analyses_watched': 0,
+    'team_selection': 0
+}
+
 
 class FanEngagementSystem:
-    def __init__(self):
-        if 'points' not in st.session_state:
-            st.session_state.points = 0
-        if 'badges' not in st.session_state:
-            st.session_state.badges = set()
-        if 'activities' not in st.session_state:
-            st.session_state.activities = []
-        if 'favorite_team' not in st.session_state:
-            st.session_state.favorite_team = None
-        if 'streak' not in st.session_state:
-            st.session_state.streak = 0
-        if 'achievements' not in st.session_state:
-            st.session_state.achievements = {
-                'games_watched': 0,
-                'predictions_made': 0,
-                'correct_predictions': 0,
-                'social_shares': 0,
-                'player_profiles_viewed': 0,
-                'video_analyses_watched': 0,
-                'team_selection': 0
-            }
+    def __init__(self, fan_id=None, store=None, leaderboard=None, predictions=None, engagement=None):
+        self.store = store or get_fan_store()
+        self.leaderboard = leaderboard or get_leaderboard()
+        self.predictions = predictions or get_prediction_book()
+        self.engagement = engagement or get_engagement_bus()
+        self.fan_id = fan_id or self._resolve_fan_id()
+        if st.session_state.get('fan_id') != self.fan_id:
+            # First run of this session for this fan: load the stored profile once
+            self._load_profile()
+        self._update_streak()
+        self._collect_prediction_results()
+        self._collect_engagement()
+
+    def _resolve_fan_id(self):
+        """Fan ID from the ?fan= query parameter or the session, minting a new one"""
+        fan_id = st.query_params.get('fan') or st.session_state.get('fan_id') or uuid.uuid4().hex
+        # Keep it in the URL so a reload or bookmark resumes the same profile
+        if st.query_params.get('fan') != fan_id:
+            st.query_params['fan'] = fan_id
+        return fan_id
+
+    def _load_profile(self):
+        profile = self.store.load(self.fan_id) or {}
+        st.session_state.points = profile.get('points', 0)
+        st.session_state.badges = set(profile.get('badges', []))
+        st.session_state.favorite_team = profile.get('favorite_team')
+        st.session_state.streak = profile.get('streak', 0)
+        st.session_state.achievements = dict(DEFAULT_ACHIEVEMENTS, **profile.get('achievements', {}))
+        if profile.get('last_login'):
+            st.session_state.last_login = date.fromisoformat(profile['last_login'])
+        else:
+            st.session_state.pop('last_login', None)
+        st.session_state.challenge = profile.get('challenge')
+        st.session_state.challenge_completed_on = profile.get('challenge_completed_on')
+        st.session_state.activities = ActivityLog(
+            capacity=config.ACTIVITY_LOG_SIZE,
+            rollup_days=config.ACTIVITY_ROLLUP_DAYS,
+            records=self.store.recent_activities(self.fan_id, config.ACTIVITY_LOG_SIZE),
+            rollups=self.store.activity_rollups(self.fan_id)
+        )
+        # Later saves only send what changed since this point
+        st.session_state.saved_profile = self._profile()
+        # Full sweep once per load picks up badges added since the profile was saved
+        st.session_state.badges.update(badge_engine.evaluate_all(
+            dict(st.session_state.achievements, points=st.session_state.points, streak=st.session_state.streak),
+            st.session_state.badges
+        ))
+        # The stored total seeds the board; while ranked, every session only adds its own points
+        if st.session_state.points and self.leaderboard.rank(self.fan_id) is None:
+            self.leaderboard.update(self.fan_id, st.session_state.points, st.session_state.favorite_team)
+        st.session_state.fan_id = self.fan_id
+
+    def _save_profile(self):
+        """Queue the session's changes since the last save for the next batched write
+
+        Only the difference is sent, so other sessions of the same fan keep
+        their points, counters and badges.
+        """
+        profile = self._profile()
+        self.store.update_profile(self.fan_id, profile_update(st.session_state.saved_profile, profile))
+        st.session_state.saved_profile = profile
+
+    def _profile(self):
+        last_login = st.session_state.get('last_login')
+        return {
+            'points': st.session_state.points,
+            'badges': sorted(st.session_state.badges),
+            'favorite_team': st.session_state.favorite_team,
+            'streak': st.session_state.streak,
+            'last_login': last_login.isoformat() if last_login else None,
+            'achievements': dict(st.session_state.achievements),
+            'challenge': st.session_state.challenge,
+            'challenge_completed_on': st.session_state.challenge_completed_on
+        }
 
     def set_favorite_team(self, team):
         st.session_state.favorite_team = team
@@ -34,84 +108,92 @@ class FanEngagementSystem:
         """Track various achievement types"""
         if achievement_type in st.session_state.achievements:
             st.session_state.achievements[achievement_type] += value
-        self._check_badges()
+            self._check_badges(achievement_type, st.session_state.achievements[achievement_type])
+        self._save_profile()
 
     def add_points(self, points, activity):
+        timestamp = datetime.now()
         st.session_state.points += points
-        st.session_state.activities.append({
-            'timestamp': datetime.now(),
-            'activity': activity,
-            'points': points
-        })
-        self._check_badges()
-        self._update_streak()
+        st.session_state.activities.append(timestamp, activity, points)
+        self.store.log_activity(self.fan_id, timestamp, activity, points)
+        self._check_badges('points', st.session_state.points)
+        self.leaderboard.add(self.fan_id, points, st.session_state.favorite_team)
+        self._save_profile()
 
     def _update_streak(self):
-        """Update daily login streak"""
-        today = datetime.now().date()
-        if 'last_login' not in st.session_state:
-            st.session_state.last_login = today
-            st.session_state.streak = 1
-        elif (today - st.session_state.last_login).days == 1:
-            st.session_state.streak += 1
-            self.add_points(st.session_state.streak * 5, f"Daily streak: {st.session_state.streak} days!")
-        elif (today - st.session_state.last_login).days > 1:
-            st.session_state.streak = 1
-        st.session_state.last_login = today
-
-    def _check_badges(self):
-        """Check and award badges based on achievements"""
-        badges_criteria = {
-            'Rookie Fan': {'points': 100, 'description': 'Earn your first 100 points', 'icon': '👶'},
-            'All-Star Fan': {'points': 500, 'description': 'Reach 500 points', 'icon': '⭐'},
-            'MVP Fan': {'points': 1000, 'description': 'Achieve 1000 points', 'icon': '🏆'},
-            'Perfect Attendance': {'streak': 7, 'description': 'Login 7 days in a row', 'icon': '📅'},
-            'Super Fan': {'streak': 30, 'description': '30-day login streak', 'icon': '🌟'},
-            'Game Guru': {'predictions': 10, 'description': 'Make 10 correct game predictions', 'icon': '🎯'},
-            'Social Butterfly': {'social_shares': 5, 'description': 'Share 5 times on social media', 'icon': '🦋'},
-            'Scout': {'player_profiles': 20, 'description': 'View 20 different player profiles', 'icon': '🔍'},
-            'Video Analyst': {'video_analyses': 10, 'description': 'Watch 10 video analyses', 'icon': '📹'},
-            'Team Loyalist': {'team_selection': 1, 'description': 'Select your favorite team', 'icon': '⚾'}
-        }
+        """Advance the daily streak once per calendar day in the fan's time zone"""
+        today = fan_today(self._timezone())
+        last_seen = st.session_state.get('last_login')
+        update = advance_streak(st.session_state.streak, last_seen, today)
+        if update.last_seen == last_seen:
+            # Already counted today
+            return
+        st.session_state.streak = update.streak
+        st.session_state.last_login = update.last_seen
+        self._check_badges('streak', update.streak)
+        if update.bonus and get_streak_ledger().claim(self.fan_id, today):
+            self.add_points(update.bonus, f"Daily streak: {update.streak} days!")
+        else:
+            self._save_profile()
+
+    def _timezone(self):
+        # Browser time zone when Streamlit reports it
+        return getattr(st.context, 'timezone', None)
 
-        achievements = st.session_state.achievements
-        for badge, criteria in badges_criteria.items():
-            if badge not in st.session_state.badges:
-                if 'points' in criteria and st.session_state.points >= criteria['points']:
-                    st.session_state.badges.add(badge)
-                elif 'streak' in criteria and st.session_state.streak >= criteria['streak']:
-                    st.session_state.badges.add(badge)
-                elif 'predictions' in criteria and achievements.get('correct_predictions', 0) >= criteria['predictions']:
-                    st.session_state.badges.add(badge)
-                elif 'social_shares' in criteria and achievements.get('social_shares', 0) >= criteria['social_shares']:
-                    st.session_state.badges.add(badge)
-                elif 'player_profiles' in criteria and achievements.get('player_profiles_viewed', 0) >= criteria['player_profiles']:
-                    st.session_state.badges.add(badge)
-                elif 'video_analyses' in criteria and achievements.get('video_analyses_watched', 0) >= criteria['video_analyses']:
-                    st.session_state.badges.add(badge)
-                elif 'team_selection' in criteria and achievements.get('team_selection', 0) >= criteria['team_selection']:
-                    st.session_state.badges.add(badge)
+    def _check_badges(self, counter, value):
+        """Award the badges of one counter reached at its new value"""
+        st.session_state.badges.update(badge_engine.evaluate(counter, value, st.session_state.badges))
 
     def get_points(self):
         return st.session_state.points
 
     def get_badges(self):
-        badges_info = {
-            'Rookie Fan': {'icon': '👶', 'description': 'Earn your first 100 points'},
-            'All-Star Fan': {'icon': '⭐', 'description': 'Reach 500 points'},
-            'MVP Fan': {'icon': '🏆', 'description': 'Achieve 1000 points'},
-            'Perfect Attendance': {'icon': '📅', 'description': 'Login 7 days in a row'},
-            'Super Fan': {'icon': '🌟', 'description': '30-day login streak'},
-            'Game Guru': {'icon': '🎯', 'description': 'Make 10 correct game predictions'},
-            'Social Butterfly': {'icon': '🦋', 'description': 'Share 5 times on social media'},
-            'Scout': {'icon': '🔍', 'description': 'View 20 different player profiles'},
-            'Video Analyst': {'icon': '📹', 'description': 'Watch 10 video analyses'},
-            'Team Loyalist': {'icon': '⚾', 'description': 'Select your favorite team'}
+        return badge_engine.info(st.session_state.badges)
+
+    def make_prediction(self, game_id, side):
+        """Pick the winner ('home' or 'away') of a game; points come when it is settled"""
+        first_pick = self.predictions.pick(self.fan_id, game_id) is None
+        self.predictions.place(self.fan_id, game_id, side)
+        if first_pick:
+            self._track_achievement('predictions_made')
+
+    def get_prediction(self, game_id):
+        return self.predictions.pick(self.fan_id, game_id)
+
+    def _collect_prediction_results(self):
+        """Apply picks settled since the last run; an O(1) read of the fan's pending totals"""
+        results = self.predictions.collect(self.fan_id)
+        if not results.settled:
+            return
+        if results.correct:
+            self._track_achievement('correct_predictions', results.correct)
+        if results.points:
+            self.add_points(
+                results.points,
+                f"{results.correct} of {results.settled} predictions correct"
+            )
+
+    def get_leaderboard_standing(self):
+        """The fan's overall and team rank (None when unranked) and the board sizes"""
+        team = st.session_state.favorite_team
+        return {
+            'rank': self.leaderboard.rank(self.fan_id),
+            'fans': len(self.leaderboard),
+            'team_rank': self.leaderboard.rank(self.fan_id, team) if team else None,
+            'team_fans': self.leaderboard.team_size(team) if team else 0
         }
-        return [(badge, badges_info[badge]) for badge in st.session_state.badges]
 
-    def get_activities(self):
-        return st.session_state.activities
+    def get_top_fans(self, k=10, team=None):
+        """List of (rank, fan_id, points) overall or within a team"""
+        return self.leaderboard.top(k, team)
+
+    def get_activities(self, offset=0, limit=20):
+        """Page of recent activities, newest first"""
+        return st.session_state.activities.page(offset, limit)
+
+    def get_activity_rollups(self):
+        """Daily (date, count, points) totals of older activities"""
+        return st.session_state.activities.rollups()
 
     def get_achievements_progress(self):
         """Get progress towards achievements"""
@@ -119,18 +201,29 @@ class FanEngagementSystem:
 
     def track_video_analysis(self):
         """Track when user watches a video analysis"""
-        self._track_achievement('video_analyses_watched')
-        self.add_points(15, "Watched video analysis")
+        self.engagement.publish(self.fan_id, 'video_analysis')
 
     def track_profile_view(self):
         """Track when user views a player profile"""
-        self._track_achievement('player_profiles_viewed')
-        self.add_points(5, "Viewed player profile")
+        self.engagement.publish(self.fan_id, 'profile_view')
 
     def track_social_share(self):
         """Track when user shares content"""
-        self._track_achievement('social_shares')
-        self.add_points(20, "Shared content on social media")
+        self.engagement.publish(self.fan_id, 'social_share')
+
+    def get_community_activity(self):
+        """Today's tracked engagement across all fans, as achievement counter -> count"""
+        return {
+            ENGAGEMENT_ACTIONS[action][0]: count
+            for action, count in self.engagement.daily_rollups().items()
+        }
+
+    def _collect_engagement(self):
+        """Apply tracked events the aggregator has batched since the last run"""
+        for action, count in self.engagement.collect(self.fan_id).items():
+            counter, points, activity = ENGAGEMENT_ACTIONS[action]
+            self._track_achievement(counter, count)
+            self.add_points(points * count, activity if count == 1 else f"{activity} (x{count})")
 
     def get_streak_info(self):
         return {
@@ -147,37 +240,29 @@ class FanEngagementSystem:
                 return milestone
         return milestones[-1]
 
-    def generate_challenge(self):
-        """Generate personalized challenges based on user's favorite team and current achievements"""
-        team_specific_challenges = [
-            {'task': f'Watch a full {st.session_state.favorite_team} game', 'points': 50},
-            {'task': f'Predict the winner of next {st.session_state.favorite_team} game', 'points': 30},
-            {'task': f'Share {st.session_state.favorite_team} highlights on social media', 'points': 20}
-        ] if st.session_state.favorite_team else []
-
-        # Dynamic challenges based on missing achievements
-        achievement_based_challenges = []
-        achievements = st.session_state.achievements
-
-        if achievements['video_analyses_watched'] < 10:
-            achievement_based_challenges.append(
-                {'task': 'Watch a video analysis of today\'s game', 'points': 15}
-            )
-        if achievements['player_profiles_viewed'] < 20:
-            achievement_based_challenges.append(
-                {'task': 'View 3 new player profiles', 'points': 15}
-            )
-        if achievements['social_shares'] < 5:
-            achievement_based_challenges.append(
-                {'task': 'Share your favorite player stats', 'points': 20}
+    def get_daily_challenge(self):
+        """Today's challenge for this fan, fixed for the whole day"""
+        today = fan_today(self._timezone())
+        challenge = st.session_state.get('challenge')
+        if challenge is None or challenge['day'] != today.isoformat():
+            challenge = get_challenge_scheduler().assign(
+                self.fan_id, today.isoformat(), st.session_state.favorite_team, st.session_state.achievements
             )
+            challenge['day'] = today.isoformat()
+            st.session_state.challenge = challenge
+            self._save_profile()
+        return challenge
 
-        general_challenges = [
-            {'task': 'Complete daily baseball trivia', 'points': 25},
-            {'task': 'Predict total runs in today\'s games', 'points': 35},
-            {'task': 'Create a game day prediction', 'points': 40},
-            {'task': 'Analyze a player\'s performance', 'points': 45}
-        ]
+    def is_challenge_completed(self):
+        return st.session_state.get('challenge_completed_on') == fan_today(self._timezone()).isoformat()
 
-        all_challenges = team_specific_challenges + achievement_based_challenges + general_challenges
-        return random.choice(all_challenges)
\ No newline at end of file
+    def complete_challenge(self, points):
+        """Pay today's challenge once; returns False if it was already completed"""
+        day = fan_today(self._timezone()).isoformat()
+        if st.session_state.get('challenge_completed_on') == day:
+            return False
+        if not get_challenge_scheduler().complete(self.fan_id, day):
+            return False
+        st.session_state.challenge_completed_on = day
+        self.add_points(points, self.get_daily_challenge()['task'])
+        return True
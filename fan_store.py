@@ -0,0 +1,407 @@
+"""Server-side persistence of fan profiles.
+
+A profile (points, badges, streak, favorite team and achievement counters)
+is loaded once per session; after that FanEngagementSystem works on its
+session copy and hands every change to a WriteBehindFanStore as an update:
+points and achievement counters as increments, badges as additions and
+other fields only when they changed. Updates are merged per fan and applied
+to the stored profile in one batch every few seconds, so two sessions of
+the same fan never overwrite each other's progress.
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import config
+from singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+
+# Profile fields stored as running totals, merged by adding increments
+COUNTER_FIELDS = ('points',)
+# Profile fields holding a dict of running totals
+COUNTER_MAP_FIELDS = ('achievements',)
+# Profile fields holding a set, merged by union
+SET_FIELDS = ('badges',)
+
+
+def profile_update(base, profile):
+    """The update that turns profile `base` into `profile`"""
+    update = {}
+    for field, value in profile.items():
+        old = base.get(field)
+        if field in COUNTER_FIELDS:
+            if value != (old or 0):
+                update[field] = value - (old or 0)
+        elif field in COUNTER_MAP_FIELDS:
+            old = old or {}
+            changes = {key: count - old.get(key, 0) for key, count in value.items() if count != old.get(key, 0)}
+            if changes:
+                update[field] = changes
+        elif field in SET_FIELDS:
+            added = sorted(set(value) - set(old or ()))
+            if added:
+                update[field] = added
+        elif value != old:
+            update[field] = value
+    return update
+
+
+def merge_update(profile, update):
+    """A new profile (or update) with `update` applied after it
+
+    A stored profile is itself the update from an empty one, so this both
+    applies updates to profiles and folds consecutive updates together.
+    """
+    merged = dict(profile or {})
+    for field, value in update.items():
+        if field in COUNTER_FIELDS:
+            merged[field] = merged.get(field, 0) + value
+        elif field in COUNTER_MAP_FIELDS:
+            counters = dict(merged.get(field) or {})
+            for key, count in value.items():
+                counters[key] = counters.get(key, 0) + count
+            merged[field] = counters
+        elif field in SET_FIELDS:
+            merged[field] = sorted(set(merged.get(field) or ()) | set(value))
+        else:
+            merged[field] = value
+    return merged
+
+
+def daily_totals(records):
+    """Per-day [count, points] of activity rows, by local ISO date
+
+    Each row has the epoch timestamp second and the points last.
+    """
+    totals = {}
+    for record in records:
+        day = date.fromtimestamp(record[1]).isoformat()
+        day_totals = totals.setdefault(day, [0, 0])
+        day_totals[0] += 1
+        day_totals[1] += record[-1]
+    return totals
+
+
+class FanProfileStore:
+    """Interface for fan profile storage backends.
+
+    A profile is a JSON-serializable dict; activities are stored separately
+    as (fan_id, timestamp, activity, points) records.
+    """
+
+    name = None
+
+    def load(self, fan_id):
+        """The stored profile of a fan, or None for a new fan"""
+        raise NotImplementedError
+
+    def recent_activities(self, fan_id, limit=50):
+        """The fan's latest activity records, oldest first"""
+        raise NotImplementedError
+
+    def activity_rollups(self, fan_id):
+        """Daily totals of the fan's activities no longer kept individually
+
+        Returns:
+            Dict of ISO day -> [count, points], as accepted by ActivityLog
+        """
+        raise NotImplementedError
+
+    def write_batch(self, updates, activities):
+        """Apply many profile updates and store activity records in one transaction
+
+        Args:
+            updates: Dict of fan_id -> update (see merge_update), applied
+                atomically on top of the stored profile
+            activities: List of (fan_id, timestamp, activity, points) tuples;
+                beyond the newest `activity_capacity` per fan they are folded
+                into daily rollups, keeping `rollup_days` days
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryFanStore(FanProfileStore):
+    """Process-local store, for single-replica development and tests"""
+
+    name = 'memory'
+
+    def __init__(self, activity_capacity=None, rollup_days=None):
+        self.activity_capacity = activity_capacity or config.ACTIVITY_LOG_SIZE
+        self.rollup_days = rollup_days or config.ACTIVITY_ROLLUP_DAYS
+        self._profiles = {}
+        self._activities = {}
+        self._rollups = {}
+        self._lock = threading.Lock()
+
+    def load(self, fan_id):
+        with self._lock:
+            profile = self._profiles.get(fan_id)
+            return json.loads(profile) if profile is not None else None
+
+    def recent_activities(self, fan_id, limit=50):
+        with self._lock:
+            return list(self._activities.get(fan_id, [])[-limit:])
+
+    def activity_rollups(self, fan_id):
+        with self._lock:
+            return {day: list(totals) for day, totals in self._rollups.get(fan_id, {}).items()}
+
+    def write_batch(self, updates, activities):
+        with self._lock:
+            for fan_id, update in updates.items():
+                profile = self._profiles.get(fan_id)
+                profile = json.loads(profile) if profile is not None else None
+                self._profiles[fan_id] = json.dumps(merge_update(profile, update))
+            for record in activities:
+                self._activities.setdefault(record[0], []).append(record)
+            for fan_id in {record[0] for record in activities}:
+                records = self._activities[fan_id]
+                records.sort(key=lambda record: record[1])
+                overflow = len(records) - self.activity_capacity
+                if overflow > 0:
+                    rollups = self._rollups.setdefault(fan_id, {})
+                    for day, (count, points) in daily_totals(records[:overflow]).items():
+                        totals = rollups.setdefault(day, [0, 0])
+                        totals[0] += count
+                        totals[1] += points
+                    for day in sorted(rollups)[:-self.rollup_days]:
+                        del rollups[day]
+                    del records[:overflow]
+
+
+class SQLiteFanStore(FanProfileStore):
+    """Fan profiles in a local SQLite database (WAL mode, one shared connection)"""
+
+    name = 'sqlite'
+
+    def __init__(self, path=None, activity_capacity=None, rollup_days=None):
+        self.path = path or config.FAN_STORE_PATH
+        self.activity_capacity = activity_capacity or config.ACTIVITY_LOG_SIZE
+        self.rollup_days = rollup_days or config.ACTIVITY_ROLLUP_DAYS
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS fans ('
+                'fan_id TEXT PRIMARY KEY, profile TEXT NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS activities ('
+                'fan_id TEXT NOT NULL, timestamp REAL NOT NULL, activity TEXT NOT NULL, points INTEGER NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS activities_by_fan ON activities (fan_id, timestamp)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS activity_rollups ('
+                'fan_id TEXT NOT NULL, day TEXT NOT NULL, count INTEGER NOT NULL, points INTEGER NOT NULL, '
+                'PRIMARY KEY (fan_id, day))'
+            )
+
+    def load(self, fan_id):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT profile FROM fans WHERE fan_id = ?', (fan_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def recent_activities(self, fan_id, limit=50):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT fan_id, timestamp, activity, points FROM activities '
+                'WHERE fan_id = ? ORDER BY timestamp DESC LIMIT ?',
+                (fan_id, limit)
+            ).fetchall()
+        return rows[::-1]
+
+    def activity_rollups(self, fan_id):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT day, count, points FROM activity_rollups WHERE fan_id = ?', (fan_id,)
+            ).fetchall()
+        return {day: [count, points] for day, count, points in rows}
+
+    def write_batch(self, updates, activities):
+        now = time.time()
+        with self._lock:
+            # Take the write lock before reading, so other processes sharing
+            # the database cannot change a profile between our read and write
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                rows = []
+                for fan_id, update in updates.items():
+                    row = self._connection.execute(
+                        'SELECT profile FROM fans WHERE fan_id = ?', (fan_id,)
+                    ).fetchone()
+                    profile = merge_update(json.loads(row[0]) if row else None, update)
+                    rows.append((fan_id, json.dumps(profile), now))
+                self._connection.executemany(
+                    'INSERT INTO fans (fan_id, profile, updated_at) VALUES (?, ?, ?) '
+                    'ON CONFLICT (fan_id) DO UPDATE SET profile = excluded.profile, updated_at = excluded.updated_at',
+                    rows
+                )
+                self._connection.executemany(
+                    'INSERT INTO activities (fan_id, timestamp, activity, points) VALUES (?, ?, ?, ?)',
+                    activities
+                )
+                for fan_id in {record[0] for record in activities}:
+                    self._roll_up(fan_id)
+            except BaseException:
+                self._connection.rollback()
+                raise
+            self._connection.commit()
+
+    def _roll_up(self, fan_id):
+        """Fold the fan's activities beyond the newest activity_capacity into daily rollups"""
+        old = self._connection.execute(
+            'SELECT rowid, timestamp, points FROM activities WHERE fan_id = ? '
+            'ORDER BY timestamp DESC, rowid DESC LIMIT -1 OFFSET ?',
+            (fan_id, self.activity_capacity)
+        ).fetchall()
+        if not old:
+            return
+        self._connection.executemany(
+            'INSERT INTO activity_rollups (fan_id, day, count, points) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (fan_id, day) DO UPDATE SET '
+            'count = count + excluded.count, points = points + excluded.points',
+            [
+                (fan_id, day, count, points)
+                for day, (count, points) in daily_totals(old).items()
+            ]
+        )
+        self._connection.executemany('DELETE FROM activities WHERE rowid = ?', [(row[0],) for row in old])
+        self._connection.execute(
+            'DELETE FROM activity_rollups WHERE fan_id = ? AND day NOT IN ('
+            'SELECT day FROM activity_rollups WHERE fan_id = ? ORDER BY day DESC LIMIT ?)',
+            (fan_id, fan_id, self.rollup_days)
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+FAN_STORE_BACKENDS = {
+    SQLiteFanStore.name: SQLiteFanStore,
+    MemoryFanStore.name: MemoryFanStore
+}
+
+
+def create_fan_store(name=None):
+    """Instantiate a registered fan store backend, defaulting to config.FAN_STORE_BACKEND"""
+    name = name or config.FAN_STORE_BACKEND
+    if name not in FAN_STORE_BACKENDS:
+        raise ValueError(f"Unknown fan store backend: {name}")
+    return FAN_STORE_BACKENDS[name]()
+
+
+class WriteBehindFanStore:
+    """Buffers profile and activity writes and flushes them in batches.
+
+    update_profile and log_activity only touch in-memory buffers, so they
+    are cheap enough for the request path. A background thread writes the
+    buffers every `flush_seconds`; updates of one profile between flushes
+    are merged into a single row write.
+    """
+
+    def __init__(self, store, flush_seconds=2.0):
+        self.store = store
+        self.flush_seconds = flush_seconds
+        self._updates = {}
+        self._activities = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='fan-store-flush', daemon=True)
+        self._thread.start()
+
+    def load(self, fan_id):
+        """The fan's profile, including updates not flushed yet"""
+        with self._lock:
+            update = self._updates.get(fan_id)
+        profile = self.store.load(fan_id)
+        if update is None:
+            return profile
+        return json.loads(json.dumps(merge_update(profile, update)))
+
+    def recent_activities(self, fan_id, limit=50):
+        """The fan's latest (timestamp, activity, points) records, including unflushed ones"""
+        with self._lock:
+            pending = [record for record in self._activities if record[0] == fan_id]
+        records = (self.store.recent_activities(fan_id, limit) + pending)[-limit:]
+        return [record[1:] for record in records]
+
+    def activity_rollups(self, fan_id):
+        return self.store.activity_rollups(fan_id)
+
+    def update_profile(self, fan_id, update):
+        """Queue an update (see profile_update) of the fan's stored profile"""
+        if not update:
+            return
+        with self._lock:
+            self._updates[fan_id] = merge_update(self._updates.get(fan_id), update)
+
+    def log_activity(self, fan_id, timestamp, activity, points):
+        with self._lock:
+            self._activities.append((fan_id, timestamp.timestamp(), activity, points))
+
+    def flush(self):
+        """Write everything buffered so far"""
+        # Serialize flushes so batches reach the store in order
+        with self._flush_lock:
+            with self._lock:
+                updates, self._updates = self._updates, {}
+                activities, self._activities = self._activities, []
+            if not updates and not activities:
+                return
+            try:
+                self.store.write_batch(updates, activities)
+            except Exception:
+                # Put the batch back ahead of newer updates and retry next interval
+                with self._lock:
+                    for fan_id, update in updates.items():
+                        newer = self._updates.get(fan_id)
+                        self._updates[fan_id] = merge_update(update, newer) if newer else update
+                    self._activities[:0] = activities
+                raise
+
+    def close(self):
+        """Stop the flush thread and write what is left"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self.store.close()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception:
+                # flush re-queued the batch, so it is retried next interval
+                logger.exception("Fan store flush failed")
+
+
+@process_singleton
+def get_fan_store():
+    """Process-wide write-behind fan store, built on first use"""
+    store = WriteBehindFanStore(
+        create_fan_store(),
+        flush_seconds=config.FAN_STORE_FLUSH_SECONDS
+    )
+    atexit.register(store.close)
+    return store
@@ -0,0 +1,196 @@
+"""Local key moment detection by sampling and differencing video frames.
+
+Frames are decoded at a fixed stride, reduced to small grayscale images and
+scored in chunks: a motion score from the mean absolute difference between
+consecutive samples, and a scene change score from the distance between
+their intensity histograms. score_frame_range decodes and scores one range
+of frames so a video can be split across worker processes.
+"""
+import bisect
+
+import numpy as np
+
+HISTOGRAM_BINS = 16
+
+
+def score_frame_chunk(frames):
+    """Motion and scene change scores between consecutive frames
+
+    Args:
+        frames: uint8 array of shape (n, height, width); the first frame is
+            the last sample of the previous chunk, or repeated for the first chunk
+
+    Returns:
+        Tuple of float32 arrays (motion, scene), each of length n - 1
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    n = len(frames)
+    if n < 2:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    # Mean absolute pixel change, scaled to 0-1
+    diff = np.abs(frames[1:].astype(np.int16) - frames[:-1].astype(np.int16))
+    motion = diff.reshape(n - 1, -1).mean(axis=1) / 255.0
+
+    # Per-frame intensity histograms in one bincount via per-frame bin offsets
+    bins = (frames >> (8 - int(np.log2(HISTOGRAM_BINS)))).reshape(n, -1).astype(np.int64)
+    bins += (np.arange(n) * HISTOGRAM_BINS)[:, None]
+    hist = np.bincount(bins.ravel(), minlength=n * HISTOGRAM_BINS).reshape(n, HISTOGRAM_BINS)
+    hist = hist / hist.sum(axis=1, keepdims=True)
+    # Total variation distance between neighbouring histograms, 0-1
+    scene = 0.5 * np.abs(hist[1:] - hist[:-1]).sum(axis=1)
+
+    return motion.astype(np.float32), scene.astype(np.float32)
+
+
+def _open_capture(path):
+    try:
+        import cv2
+    except ImportError as e:
+        raise ImportError(
+            "The frame sampling highlight analyzer needs OpenCV: pip install opencv-python-headless"
+        ) from e
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    return cv2, capture
+
+
+def probe_video(path):
+    """Return (fps, frame_count) of a video; frame_count is 0 when unknown"""
+    cv2, capture = _open_capture(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        return fps, int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    finally:
+        capture.release()
+
+
+def read_frame_chunks(path, stride=5, chunk_frames=256, frame_width=160, start_frame=0, stop_frame=None):
+    """Decode every `stride`-th frame in [start_frame, stop_frame) as small grayscale chunks
+
+    Requires OpenCV (opencv-python-headless).
+
+    Yields:
+        Tuples of (timestamps in seconds, uint8 frames)
+    """
+    cv2, capture = _open_capture(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        if start_frame:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        timestamps, frames = [], []
+        index = start_frame
+        while stop_frame is None or index < stop_frame:
+            # grab() skips frames without the cost of converting them
+            if not capture.grab():
+                break
+            if index % stride == 0:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                height = max(1, round(gray.shape[0] * frame_width / gray.shape[1]))
+                frames.append(cv2.resize(gray, (frame_width, height), interpolation=cv2.INTER_AREA))
+                timestamps.append(index / fps)
+                if len(frames) == chunk_frames:
+                    yield np.asarray(timestamps), np.stack(frames)
+                    timestamps, frames = [], []
+            index += 1
+
+        if frames:
+            yield np.asarray(timestamps), np.stack(frames)
+    finally:
+        capture.release()
+
+
+def score_frame_range(path, start_frame, stop_frame, stride=5, frame_width=160, chunk_frames=256):
+    """Decode and score the sampled frames of one range of a video
+
+    Runs entirely in the calling process, so a pool worker only sends back
+    the small score arrays rather than decoded frames. The range starts one
+    sample early so its first frame has a predecessor to be compared with.
+
+    Returns:
+        Tuple of (timestamps, motion, scene) arrays for samples in the range
+    """
+    lead_frame = max(0, start_frame - stride)
+    timestamps, motion, scene = [], [], []
+    previous = None
+    for chunk_timestamps, frames in read_frame_chunks(
+        path, stride, chunk_frames, frame_width, lead_frame, stop_frame
+    ):
+        lead = frames[:1] if previous is None else previous
+        previous = frames[-1:]
+        chunk_motion, chunk_scene = score_frame_chunk(np.concatenate([lead, frames]))
+        timestamps.append(chunk_timestamps)
+        motion.append(chunk_motion)
+        scene.append(chunk_scene)
+
+    if not timestamps:
+        empty = np.empty(0, dtype=np.float32)
+        return empty, empty, empty
+
+    timestamps = np.concatenate(timestamps)
+    motion = np.concatenate(motion)
+    scene = np.concatenate(scene)
+    if lead_frame < start_frame:
+        # Drop the lead sample; it belongs to the previous range
+        timestamps, motion, scene = timestamps[1:], motion[1:], scene[1:]
+    return timestamps, motion, scene
+
+
+def detect_key_moments(timestamps, motion, scene, motion_z=2.5, scene_threshold=0.35, min_gap=5.0):
+    """Pick key moments from per-sample motion and scene change scores
+
+    A sample is a scene change when its histogram distance exceeds
+    `scene_threshold`, and a high-motion moment when its motion score is
+    `motion_z` standard deviations above the video's mean. Moments closer
+    than `min_gap` seconds to a stronger one are dropped.
+
+    Returns:
+        List of key moment dicts with timestamp, event_type and confidence
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    motion = np.asarray(motion, dtype=np.float64)
+    scene = np.asarray(scene, dtype=np.float64)
+    if len(timestamps) == 0:
+        return []
+
+    std = motion.std()
+    z = (motion - motion.mean()) / std if std > 0 else np.zeros_like(motion)
+
+    candidates = []
+    scene_mask = scene > scene_threshold
+    motion_mask = (z > motion_z) & ~scene_mask
+    for mask, event_type, strength in (
+        (scene_mask, 'scene_change', scene),
+        (motion_mask, 'high_motion', 1 - np.exp(-np.maximum(z, 0) / motion_z))
+    ):
+        positions = np.flatnonzero(mask)
+        candidates.extend(
+            (float(strength[position]), float(timestamps[position]), event_type)
+            for position in positions
+        )
+
+    # Strongest first, suppressing weaker moments within min_gap seconds
+    kept = []
+    kept_times = []
+    for confidence, timestamp, event_type in sorted(candidates, reverse=True):
+        position = bisect.bisect_left(kept_times, timestamp)
+        if position > 0 and timestamp - kept_times[position - 1] < min_gap:
+            continue
+        if position < len(kept_times) and kept_times[position] - timestamp < min_gap:
+            continue
+        kept_times.insert(position, timestamp)
+        kept.append((confidence, timestamp, event_type))
+
+    return [
+        {
+            'timestamp': int(timestamp),
+            'event_type': event_type,
+            'confidence': round(min(confidence, 1.0), 3)
+        }
+        for confidence, timestamp, event_type in sorted(kept, key=lambda item: item[1])
+    ]
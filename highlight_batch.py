@@ -0,0 +1,176 @@
+"""Precompute highlights for a batch of game videos.
+
+Analyzes every video under a directory or in a manifest concurrently and writes the
+key moments of all of them to one gzip-compressed JSON file that the
+Highlights section can load (FAN_HUB_HIGHLIGHT_PRECOMPUTED_PATH).
+
+    python highlight_batch.py videos/ -o highlights.json.gz --parallelism 4
+    python highlight_batch.py tonight.txt --backend frame_sampling
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from highlight_cache import file_sha256, get_result_cache, highlight_cache_key, write_highlight_results
+from highlight_generator import ANALYZER_BACKENDS, create_analyzer_backend
+from highlight_reel import build_reel
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+# google.api_core error names worth retrying, matched by name so the CLI does
+# not need the Google libraries for local backends
+TRANSIENT_ERROR_NAMES = {
+    'ServiceUnavailable', 'DeadlineExceeded', 'TooManyRequests',
+    'InternalServerError', 'Aborted', 'ResourceExhausted'
+}
+
+
+def is_transient(error):
+    """Whether an analysis error is likely to succeed on retry"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in TRANSIENT_ERROR_NAMES
+
+
+def collect_videos(source):
+    """Video paths from a directory tree, a .txt manifest (one path per line) or a .json list"""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        )
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        if source.endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    # Relative manifest entries are resolved against the manifest's directory;
+    # a video listed twice is analyzed once
+    paths = (entry if os.path.isabs(entry) else os.path.join(base, entry) for entry in entries)
+    return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def analyze_with_retry(backend, path, retries=3, backoff=2.0, cache=None):
+    """Analyze one video, retrying transient failures with exponential backoff
+
+    Returns:
+        Tuple of (sha256, key_moments)
+    """
+    sha256 = file_sha256(path)
+    key = highlight_cache_key(sha256, backend.analysis_params())
+    if cache is not None:
+        key_moments = cache.get(key)
+        if key_moments is not None:
+            return sha256, key_moments
+
+    attempt = 0
+    while True:
+        try:
+            key_moments = backend.analyze(path)
+            break
+        except Exception as e:
+            attempt += 1
+            if attempt > retries or not is_transient(e):
+                raise
+            # Full jitter keeps parallel retries from hitting the API in lockstep
+            time.sleep(random.uniform(0, backoff * 2 ** (attempt - 1)))
+
+    if cache is not None:
+        cache.put(key, key_moments)
+    return sha256, key_moments
+
+
+def run_batch(videos, backend, parallelism=4, retries=3, backoff=2.0, cache=None,
+              reel_dir=None, reel_top=5, log=print):
+    """Analyze videos concurrently, optionally cutting a highlight reel for each
+
+    Returns:
+        Tuple of (results, failures) dicts keyed by video path relative to the
+        videos' common directory
+    """
+    results, failures = {}, {}
+    if not videos:
+        return results, failures
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in videos])
+
+    with ThreadPoolExecutor(max_workers=parallelism) as pool:
+        futures = {
+            pool.submit(analyze_with_retry, backend, path, retries, backoff, cache): path
+            for path in videos
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            # Relative paths keep same-named videos from different folders apart
+            name = os.path.relpath(path, base).replace(os.sep, '/')
+            try:
+                sha256, key_moments = future.result()
+            except Exception as e:
+                failures[name] = f"{type(e).__name__}: {e}"
+                log(f"FAILED {name}: {e}")
+                continue
+            results[name] = {'sha256': sha256, 'key_moments': key_moments}
+            log(f"done   {name}: {len(key_moments)} key moments")
+
+            if reel_dir:
+                stem, extension = os.path.splitext(name)
+                reel_path = os.path.normpath(os.path.join(reel_dir, f"{stem}_reel{extension}"))
+                try:
+                    os.makedirs(os.path.dirname(reel_path), exist_ok=True)
+                    segments = build_reel(path, key_moments, reel_path, top_n=reel_top)
+                except Exception as e:
+                    log(f"FAILED reel for {name}: {e}")
+                    continue
+                if segments:
+                    results[name]['reel'] = {
+                        'path': reel_path,
+                        'segments': [[segment['start'], segment['end']] for segment in segments]
+                    }
+
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help="Directory of videos or manifest file (.txt or .json)")
+    parser.add_argument('-o', '--output', default='highlights.json.gz')
+    parser.add_argument('--backend', choices=sorted(ANALYZER_BACKENDS), help="Defaults to FAN_HUB_HIGHLIGHT_BACKEND")
+    parser.add_argument('--parallelism', type=int, default=4, help="Videos analyzed at once")
+    parser.add_argument('--retries', type=int, default=3, help="Retries per video for transient errors")
+    parser.add_argument('--backoff', type=float, default=2.0, help="Base backoff in seconds")
+    parser.add_argument('--no-cache', action='store_true', help="Skip the shared highlight result cache")
+    parser.add_argument('--reel-dir', help="Also write a highlight reel per video to this directory")
+    parser.add_argument('--reel-top', type=int, default=5, help="Segments per highlight reel")
+    args = parser.parse_args(argv)
+
+    videos = collect_videos(args.source)
+    if not videos:
+        print(f"No videos found in {args.source}", file=sys.stderr)
+        return 1
+
+    backend = create_analyzer_backend(args.backend)
+    cache = None if args.no_cache else get_result_cache()
+    start = time.perf_counter()
+    if args.reel_dir:
+        os.makedirs(args.reel_dir, exist_ok=True)
+    results, failures = run_batch(
+        videos, backend, args.parallelism, args.retries, args.backoff, cache,
+        reel_dir=args.reel_dir, reel_top=args.reel_top
+    )
+    write_highlight_results(args.output, results, backend.analysis_params(), failures)
+    print(
+        f"{len(results)} analyzed, {len(failures)} failed in {time.perf_counter() - start:.1f}s "
+        f"-> {args.output}"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import config
+from singleton import process_singleton
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_sha256(file_obj, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 hex digest of a binary file object, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 hex digest of a file on disk"""
+    with open(path, 'rb') as f:
+        return stream_sha256(f, chunk_size)
+
+
+def highlight_cache_key(video_sha256, analysis_params):
+    """Cache key for a video's content plus the parameters it was analyzed with"""
+    params = json.dumps(analysis_params, sort_keys=True)
+    return hashlib.sha256(f"{video_sha256}:{params}".encode()).hexdigest()
+
+
+class HighlightResultCache:
+    """Disk-backed, content-addressed cache of extracted key moments.
+
+    Each entry is a small JSON file named by its cache key. Entries older
+    than `ttl_seconds` are ignored and removed, and once the directory grows
+    past `max_bytes` the least recently read entries are evicted first.
+    """
+
+    def __init__(self, cache_dir, ttl_seconds=7 * 24 * 3600, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached key moments for a key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.ttl_seconds and time.time() - entry['created_at'] > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        # Access time drives LRU eviction; set it explicitly since mounts may use noatime
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        return entry['key_moments']
+
+    def put(self, key, key_moments):
+        """Store the key moments for a key and evict if over budget"""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'created_at': time.time(), 'key_moments': key_moments}, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones beyond max_bytes"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self.ttl_seconds and now - stat.st_mtime > self.ttl_seconds:
+                    self._remove(path)
+                else:
+                    entries.append((stat.st_atime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def write_highlight_results(path, results, analysis_params, failures=None):
+    """Write precomputed batch results as gzip-compressed JSON, atomically
+
+    Args:
+        results: Dict of video name -> {'sha256', 'key_moments'}
+        analysis_params: Parameters of the backend that produced the results
+        failures: Optional dict of video name -> error message
+    """
+    payload = {
+        'generated_at': time.time(),
+        'analysis': analysis_params,
+        'videos': results,
+        'failures': failures or {}
+    }
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_highlight_results(path):
+    """Read a file written by write_highlight_results"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@process_singleton
+def get_result_cache():
+    """Process-wide highlight result cache, built on first use"""
+    return HighlightResultCache(
+        cache_dir=config.HIGHLIGHT_CACHE_DIR,
+        ttl_seconds=config.HIGHLIGHT_CACHE_TTL_SECONDS,
+        max_bytes=config.HIGHLIGHT_CACHE_MAX_MB * 1024 * 1024
+    )
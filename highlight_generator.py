@@ -1,72 +1,392 @@
 import streamlit as st
-from google.cloud import videointelligence
-from google.cloud import aiplatform
+import hashlib
+import multiprocessing
+import os
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
+import config
+import frame_analyzer
+from highlight_cache import file_sha256, get_result_cache, highlight_cache_key, load_highlight_results
+from highlight_jobs import JOB_DONE, JOB_FAILED, HighlightQueueFull, discard_spool, get_job_queue
+from singleton import process_singleton
+
+# Process-wide Google Cloud clients, created on first use. Each client owns a
+# single gRPC channel that multiplexes concurrent requests from all sessions.
+@process_singleton
+def get_video_client():
+    """Shared Video Intelligence client, built on first call"""
+    from google.cloud import videointelligence
+    return videointelligence.VideoIntelligenceServiceClient()
+
+
+@process_singleton
+def get_storage_client():
+    """Shared Cloud Storage client used to stage large uploads, built on first call"""
+    from google.cloud import storage
+    return storage.Client()
+
+
+@process_singleton
+def get_prediction_client():
+    """Shared Vertex AI prediction client, built on first call"""
+    from google.cloud import aiplatform
+    return aiplatform.gapic.PredictionServiceClient(client_options={
+        "api_endpoint": config.VERTEX_AI_ENDPOINT
+    })
+
+
+class AnalyzerBackend:
+    """Interface for highlight analyzers.
+
+    Backends turn a video reference into a list of key moments, each a dict
+    with 'timestamp', 'event_type', 'confidence' and 'description'.
+    """
+
+    name = None
+
+    def analyze(self, video_uri, progress=None):
+        """Detect key moments in a video
+
+        Args:
+            video_uri: GCS URI or local file path of the video
+            progress: Optional callback taking a 0-1 completion fraction
+        """
+        raise NotImplementedError
+
+    def analysis_params(self):
+        """Parameters that change the result, used as part of the result cache key"""
+        return {'backend': self.name}
+
+
+class VideoIntelligenceBackend(AnalyzerBackend):
+    """Key moment detection through Google Cloud Video Intelligence"""
+
+    name = 'video_intelligence'
+
+    FEATURES = ['OBJECT_TRACKING', 'ACTION_RECOGNITION']
+
+    def __init__(self, confidence_threshold=0.8, timeout=180, poll_interval=2,
+                 staging_bucket=None, max_inline_bytes=None):
+        self.confidence_threshold = confidence_threshold
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.staging_bucket = staging_bucket or config.HIGHLIGHT_GCS_BUCKET
+        self.max_inline_bytes = max_inline_bytes or config.HIGHLIGHT_MAX_INLINE_MB * 1024 * 1024
+
+    def _stage_to_gcs(self, path):
+        """Upload a local video to the staging bucket in chunks and return its blob"""
+        blob = get_storage_client().bucket(self.staging_bucket).blob(
+            f"uploads/{os.path.basename(path)}",
+            chunk_size=config.HIGHLIGHT_SPOOL_CHUNK_BYTES
+        )
+        blob.upload_from_filename(path)
+        return blob
+
+    def _annotate(self, request, progress):
+        operation = get_video_client().annotate_video(request=request)
+
+        # Poll instead of blocking in result() so progress can be reported
+        deadline = time.monotonic() + self.timeout
+        while not operation.done():
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Video analysis did not finish within {self.timeout}s")
+            if progress:
+                progress(self._operation_progress(operation))
+            time.sleep(self.poll_interval)
+
+        return operation.result()
+
+    def analysis_params(self):
+        return {
+            'backend': self.name,
+            'features': self.FEATURES,
+            'confidence_threshold': self.confidence_threshold
+        }
+
+    @staticmethod
+    def _operation_progress(operation):
+        try:
+            annotation_progress = operation.metadata.annotation_progress
+        except AttributeError:
+            return 0.0
+        if not annotation_progress:
+            return 0.0
+        return sum(item.progress_percent for item in annotation_progress) / (100 * len(annotation_progress))
+
+    def analyze(self, video_uri, progress=None):
+        from google.cloud import videointelligence
+
+        features = [videointelligence.Feature[feature] for feature in self.FEATURES]
+
+        request = {"features": features}
+        staged_blob = None
+        if str(video_uri).startswith('gs://'):
+            request["input_uri"] = video_uri
+        elif self.staging_bucket:
+            staged_blob = self._stage_to_gcs(video_uri)
+            request["input_uri"] = f"gs://{self.staging_bucket}/{staged_blob.name}"
+        else:
+            # Without a staging bucket local files are sent inline, which
+            # needs the whole video in memory, so cap their size
+            size = os.path.getsize(video_uri)
+            if size > self.max_inline_bytes:
+                raise ValueError(
+                    f"Video is {size / 1e6:.0f} MB; set FAN_HUB_HIGHLIGHT_GCS_BUCKET to analyze videos "
+                    f"larger than {self.max_inline_bytes / 1e6:.0f} MB"
+                )
+            with open(video_uri, 'rb') as f:
+                request["input_content"] = f.read()
+
+        try:
+            result = self._annotate(request, progress)
+        finally:
+            if staged_blob is not None:
+                staged_blob.delete()
+
+        # Process video analysis results
+        key_moments = []
+        for annotation in result.annotation_results[0].object_annotations:
+            if annotation.confidence > self.confidence_threshold:  # High confidence threshold
+                key_moments.append({
+                    'timestamp': annotation.frames[0].time_offset.seconds,
+                    'event_type': annotation.entity.description,
+                    'confidence': annotation.confidence,
+                    'description': describe_moment(annotation.entity.description)
+                })
+
+        return key_moments
+
+
+class StubAnalyzerBackend(AnalyzerBackend):
+    """Deterministic offline analyzer for tests and credential-free deployments"""
+
+    name = 'stub'
+
+    EVENT_TYPES = ['baseball_pitch', 'baseball_swing', 'baseball_catch', 'slide']
+
+    def __init__(self, moments=4):
+        self.moments = moments
+
+    def analysis_params(self):
+        return {'backend': self.name, 'moments': self.moments}
+
+    def analyze(self, video_uri, progress=None):
+        if progress:
+            progress(1.0)
+        # Seed from the clip's content (uploads arrive under random spool paths),
+        # so the same clip always yields the same moments
+        if os.path.isfile(video_uri):
+            digest = file_sha256(video_uri)
+        else:
+            digest = hashlib.sha256(str(video_uri).encode()).hexdigest()
+        seed = int(digest[:16], 16)
+        rng = np.random.default_rng(seed)
+        timestamps = np.sort(rng.integers(0, 600, self.moments))
+        return [
+            {
+                'timestamp': int(timestamp),
+                'event_type': str(event_type),
+                'confidence': round(float(confidence), 3),
+                'description': describe_moment(event_type)
+            }
+            for timestamp, event_type, confidence in zip(
+                timestamps,
+                rng.choice(self.EVENT_TYPES, self.moments),
+                rng.uniform(0.8, 0.99, self.moments)
+            )
+        ]
+
+
+class FrameSamplingBackend(AnalyzerBackend):
+    """Offline key moment detection by differencing sampled frames locally
+
+    The video is split into frame ranges that are decoded at `stride` and
+    scored on a shared process pool; see frame_analyzer for the scoring.
+    """
+
+    name = 'frame_sampling'
+
+    def __init__(self, stride=None, chunk_frames=256, frame_width=160,
+                 motion_z=2.5, scene_threshold=0.35, min_gap=5.0):
+        self.stride = stride or config.HIGHLIGHT_FRAME_STRIDE
+        self.chunk_frames = chunk_frames
+        self.frame_width = frame_width
+        self.motion_z = motion_z
+        self.scene_threshold = scene_threshold
+        self.min_gap = min_gap
+
+    def analysis_params(self):
+        return {
+            'backend': self.name,
+            'stride': self.stride,
+            'frame_width': self.frame_width,
+            'motion_z': self.motion_z,
+            'scene_threshold': self.scene_threshold,
+            'min_gap': self.min_gap
+        }
+
+    def analyze(self, video_uri, progress=None):
+        _, frame_count = frame_analyzer.probe_video(video_uri)
+
+        # Split the video into stride-aligned frame ranges; each worker decodes
+        # and scores its own range and only returns the small score arrays
+        span = self.stride * self.chunk_frames * 4
+        if frame_count:
+            starts = list(range(0, frame_count, span))
+            ranges = [(start, min(start + span, frame_count)) for start in starts]
+        else:
+            ranges = [(0, None)]
+
+        try:
+            results = self._score_ranges(video_uri, ranges, progress)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); retry once on a fresh pool
+            results = self._score_ranges(video_uri, ranges, progress)
+
+        timestamps, motion, scene = (np.concatenate(parts) for parts in zip(*results))
+        key_moments = frame_analyzer.detect_key_moments(
+            timestamps,
+            motion,
+            scene,
+            motion_z=self.motion_z,
+            scene_threshold=self.scene_threshold,
+            min_gap=self.min_gap
+        )
+        for moment in key_moments:
+            moment['description'] = describe_moment(moment['event_type'])
+        return key_moments
+
+    def _score_ranges(self, video_uri, ranges, progress):
+        pool = get_frame_pool()
+        try:
+            futures = {
+                pool.submit(
+                    frame_analyzer.score_frame_range,
+                    video_uri, start, stop, self.stride, self.frame_width, self.chunk_frames
+                ): position
+                for position, (start, stop) in enumerate(ranges)
+            }
+
+            results = [None] * len(ranges)
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done / len(ranges) * 0.95)
+            return results
+        except BrokenProcessPool:
+            discard_frame_pool(pool)
+            raise
+
+
+@process_singleton
+def get_frame_pool():
+    """Process pool of config.HIGHLIGHT_FRAME_WORKERS shared by frame sampling analyses
+
+    Workers start from a forkserver (spawn where that is unavailable) rather
+    than forking the multi-threaded server process.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(max_workers=config.HIGHLIGHT_FRAME_WORKERS, mp_context=context)
+
+
+def discard_frame_pool(pool):
+    """Drop a broken pool so the next get_frame_pool builds a new one"""
+    get_frame_pool.cache_clear(pool)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+ANALYZER_BACKENDS = {
+    VideoIntelligenceBackend.name: VideoIntelligenceBackend,
+    StubAnalyzerBackend.name: StubAnalyzerBackend,
+    FrameSamplingBackend.name: FrameSamplingBackend
+}
+
+
+def create_analyzer_backend(name=None):
+    """Instantiate a registered analyzer backend, defaulting to config.HIGHLIGHT_BACKEND"""
+    name = name or config.HIGHLIGHT_BACKEND
+    if name not in ANALYZER_BACKENDS:
+        raise ValueError(f"Unknown highlight analyzer backend: {name}")
+    return ANALYZER_BACKENDS[name]()
+
+
+def describe_moment(entity):
+    """Generate natural language description of detected moment"""
+    descriptions = {
+        'baseball_pitch': 'Powerful pitch delivered',
+        'baseball_swing': 'Impressive batting technique',
+        'baseball_catch': 'Spectacular fielding play',
+        'slide': 'Athletic base running displayed',
+        'scene_change': 'Broadcast cuts to a new angle',
+        'high_motion': 'Burst of action on the field'
+    }
+
+    return descriptions.get(entity, 'Notable baseball play')
+
+
 class HighlightGenerator:
-    def __init__(self):
-        self.video_client = videointelligence.VideoIntelligenceServiceClient()
-        self.ai_client = aiplatform.gapic.PredictionServiceClient(client_options={
-            "api_endpoint": "us-central1-aiplatform.googleapis.com"
-        })
+    def __init__(self, backend=None, job_queue=None, result_cache=None):
+        # Backends are cheap to build; cloud clients are only created on first analysis
+        self.backend = backend or create_analyzer_backend()
+        self.job_queue = job_queue or get_job_queue()
+        self.result_cache = result_cache or get_result_cache()
+
+    @property
+    def video_client(self):
+        return get_video_client()
 
-    def analyze_game_footage(self, video_uri):
+    @property
+    def ai_client(self):
+        return get_prediction_client()
+
+    def analyze_game_footage(self, video_uri, progress=None):
         """
-        Analyze game footage using Google Cloud Video Intelligence API
+        Analyze game footage with the configured analyzer backend
 
         Args:
-            video_uri: GCS URI of the video to analyze
+            video_uri: GCS URI or local path of the video to analyze
+            progress: Optional callback taking a 0-1 completion fraction
 
         Returns:
             List of detected key moments with timestamps and confidence scores
         """
         try:
-            features = [
-                videointelligence.Feature.OBJECT_TRACKING,
-                videointelligence.Feature.ACTION_RECOGNITION
-            ]
-
-            operation = self.video_client.annotate_video(
-                request={
-                    "input_uri": video_uri,
-                    "features": features
-                }
-            )
+            return self.backend.analyze(video_uri, progress)
 
-            result = operation.result(timeout=180)
+        except Exception as e:
+            st.error(f"Error analyzing video: {str(e)}")
+            return []
+
+    def submit_analysis(self, uploaded_file):
+        """Queue an uploaded video for background analysis and return the job ID
 
-            # Process video analysis results
-            key_moments = []
-            for annotation in result.annotation_results[0].object_annotations:
-                if annotation.confidence > 0.8:  # High confidence threshold
-                    key_moments.append({
-                        'timestamp': annotation.frames[0].time_offset.seconds,
-                        'event_type': annotation.entity.description,
-                        'confidence': annotation.confidence,
-                        'description': self._generate_moment_description(annotation)
-                    })
+        The upload is streamed to a spool file and hashed in the same pass.
+        Clips analyzed before with the same backend parameters are answered
+        from the result cache without queuing an analysis.
+        """
+        spooled = self.job_queue.spool(uploaded_file)
+        key = highlight_cache_key(spooled.sha256, self.backend.analysis_params())
+
+        key_moments = self.result_cache.get(key)
+        if key_moments is not None:
+            discard_spool(spooled.path)
+            return self.job_queue.add_result(spooled.name, key_moments)
 
+        def analyze(video_path, progress):
+            key_moments = self.backend.analyze(video_path, progress)
+            self.result_cache.put(key, key_moments)
             return key_moments
 
-        except Exception as e:
-            st.error(f"Error analyzing video: {str(e)}")
-            return []
+        return self.job_queue.submit(spooled, analyze)
 
     def _generate_moment_description(self, annotation):
         """Generate natural language description of detected moment"""
-        entity = annotation.entity.description
-        confidence = annotation.confidence
-        frame = annotation.frames[0]
-
-        descriptions = {
-            'baseball_pitch': 'Powerful pitch delivered',
-            'baseball_swing': 'Impressive batting technique',
-            'baseball_catch': 'Spectacular fielding play',
-            'slide': 'Athletic base running displayed'
-        }
-
-        return descriptions.get(entity, 'Notable baseball play')
+        return describe_moment(annotation.entity.description)
 
     def render_highlight_ui(self):
         """Render the highlight generator interface"""
@@ -79,33 +399,88 @@ class HighlightGenerator:
             </div>
         """, unsafe_allow_html=True)
 
+        self._render_precomputed()
+
         # Game selection
         st.subheader("Select Game Footage")
         uploaded_file = st.file_uploader("Upload game video", type=['mp4', 'avi', 'mov'])
 
         if uploaded_file:
-            # Process video and generate highlights
-            with st.spinner("Analyzing game footage with AI..."):
-                # Assuming uploaded_file is a file-like object.  May need adjustment based on Streamlit's file_uploader behavior.
-                key_moments = self.analyze_game_footage(uploaded_file)
-
-                if key_moments:
-                    st.success("🎉 Analysis complete! Here are your highlights:")
-
-                    for moment in key_moments:
-                        st.markdown(f"""
-                            <div class="stat-card">
-                                <h3>{moment['event_type'].replace('_', ' ').title()}</h3>
-                                <p>{moment['description']}</p>
-                                <p><em>Confidence: {moment['confidence']:.2%}</em></p>
-                                <div class="progress-bar" 
-                                     style="width: {moment['confidence']*100}%">
-                                </div>
-                            </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.warning("No significant highlights detected in the footage.")
+            # Submit each upload once; reruns keep polling the same job
+            if st.session_state.get('highlight_upload_id') != uploaded_file.file_id:
+                try:
+                    st.session_state.highlight_job_id = self.submit_analysis(uploaded_file)
+                    st.session_state.highlight_upload_id = uploaded_file.file_id
+                except HighlightQueueFull as e:
+                    st.warning(str(e))
+                    return
+
+            self._render_job_status()
+
+    def _render_job_status(self):
+        """Show the background job's results, polling only while it is unfinished"""
+        job = self.job_queue.get(st.session_state.get('highlight_job_id'))
+        if job is None:
+            st.warning("This analysis has expired, please upload the video again.")
+            return
+
+        if job['status'] == JOB_FAILED:
+            st.error(f"Error analyzing video: {job['error']}")
+            return
+
+        if job['status'] != JOB_DONE:
+            self._poll_job_progress()
+            return
+
+        self._render_key_moments(job['key_moments'])
+
+    @st.fragment(run_every=config.HIGHLIGHT_POLL_SECONDS)
+    def _poll_job_progress(self):
+        job = self.job_queue.get(st.session_state.get('highlight_job_id'))
+        if job is None or job['status'] in (JOB_DONE, JOB_FAILED):
+            # Rerun the whole page so the outcome renders outside this fragment and polling stops
+            st.rerun(scope='app')
+        st.progress(job['progress'], text="Analyzing game footage with AI...")
+
+    def _render_precomputed(self):
+        """Show highlights precomputed by highlight_batch.py, if configured"""
+        path = config.HIGHLIGHT_PRECOMPUTED_PATH
+        if not path or not os.path.exists(path):
+            return
+
+        videos = _load_precomputed(path, os.stat(path).st_mtime_ns)['videos']
+        if not videos:
+            return
+
+        st.subheader("Tonight's Highlights")
+        selected = st.selectbox("Select a game", sorted(videos))
+        if selected:
+            self._render_key_moments(videos[selected]['key_moments'])
+
+    def _render_key_moments(self, key_moments):
+        if key_moments:
+            st.success("🎉 Analysis complete! Here are your highlights:")
+
+            for moment in key_moments:
+                st.markdown(f"""
+                    <div class="stat-card">
+                        <h3>{moment['event_type'].replace('_', ' ').title()}</h3>
+                        <p>{moment['description']}</p>
+                        <p><em>Confidence: {moment['confidence']:.2%}</em></p>
+                        <div class="progress-bar" 
+                             style="width: {moment['confidence']*100}%">
+                        </div>
+                    </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.warning("No significant highlights detected in the footage.")
+
+
+@st.cache_resource(max_entries=2)
+def _load_precomputed(path, mtime_ns):
+    # mtime_ns is part of the cache key so a rewritten file is reloaded
+    return load_highlight_results(path)
 
 if __name__ == "__main__":
     generator = HighlightGenerator()
-    generator.render_highlight_ui()
\ No newline at end of file
+    generator.render_highlight_ui()
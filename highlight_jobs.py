@@ -0,0 +1,207 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from singleton import process_singleton
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+SpooledVideo = namedtuple('SpooledVideo', ['path', 'name', 'sha256', 'size'])
+
+
+class HighlightQueueFull(RuntimeError):
+    """Raised when too many highlight analyses are already waiting"""
+
+
+def spool_upload(file_obj, spool_dir, chunk_size=config.HIGHLIGHT_SPOOL_CHUNK_BYTES):
+    """Copy an upload to a spool file in fixed-size chunks, hashing as it is written
+
+    Only one chunk is held in memory at a time, so the cost of spooling does
+    not grow with the size of the video.
+
+    Returns:
+        SpooledVideo with the spool path, original name, SHA-256 and size
+    """
+    name = getattr(file_obj, 'name', None) or 'upload'
+    extension = os.path.splitext(name)[1]
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}{extension}")
+    digest = hashlib.sha256()
+    size = 0
+
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    try:
+        with open(path, 'wb') as f:
+            while True:
+                chunk = file_obj.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        discard_spool(path)
+        raise
+    return SpooledVideo(path, name, digest.hexdigest(), size)
+
+
+def discard_spool(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class HighlightJob:
+    """State of one background highlight analysis"""
+
+    def __init__(self, job_id, video_path, name):
+        self.job_id = job_id
+        self.video_path = video_path
+        self.name = name
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.key_moments = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'key_moments': self.key_moments,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class HighlightJobQueue:
+    """Bounded pool of background highlight analyses.
+
+    Uploads are streamed to a spool directory and analyzed on a worker
+    thread from that file path, so the Streamlit script thread returns a job ID immediately and
+    polls for progress. At most `max_workers` analyses run at once and at
+    most `max_pending` may be queued or running.
+    """
+
+    def __init__(self, spool_dir, max_workers=2, max_pending=20, max_finished=200,
+                 chunk_size=config.HIGHLIGHT_SPOOL_CHUNK_BYTES):
+        self.spool_dir = spool_dir
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        os.makedirs(spool_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='highlight')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def spool(self, uploaded_file):
+        """Stream an upload into the spool directory
+
+        Raises HighlightQueueFull before writing anything when no capacity
+        is left.
+        """
+        self._check_capacity()
+        return spool_upload(uploaded_file, self.spool_dir, self.chunk_size)
+
+    def submit(self, spooled, analyze):
+        """Queue the analysis of a spooled video
+
+        Args:
+            spooled: SpooledVideo returned by spool(); its file is removed
+                once the analysis finishes
+            analyze: Callable (video_path, progress) -> key_moments, where
+                progress is a callback taking a 0-1 completion fraction
+
+        Returns:
+            ID of the queued job
+        """
+        try:
+            self._check_capacity()
+        except HighlightQueueFull:
+            discard_spool(spooled.path)
+            raise
+        job = HighlightJob(uuid.uuid4().hex, spooled.path, spooled.name)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._executor.submit(self._run, job, analyze)
+        return job.job_id
+
+    def add_result(self, name, key_moments):
+        """Record an already finished analysis, e.g. a cache hit, and return its job ID"""
+        job = HighlightJob(uuid.uuid4().hex, None, name)
+        job.key_moments = key_moments
+        job.progress = 1.0
+        job.status = JOB_DONE
+        job.finished_at = job.created_at
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        return job.job_id
+
+    def get(self, job_id):
+        """Snapshot of a job's state, or None if it is unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def active_count(self):
+        with self._lock:
+            return sum(job.status in (JOB_QUEUED, JOB_RUNNING) for job in self._jobs.values())
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _check_capacity(self):
+        if self.active_count() >= self.max_pending:
+            raise HighlightQueueFull("Too many highlight analyses in progress, please try again shortly")
+
+    def _run(self, job, analyze):
+        job.status = JOB_RUNNING
+
+        def progress(fraction):
+            job.progress = max(job.progress, min(1.0, float(fraction)))
+
+        try:
+            job.key_moments = analyze(job.video_path, progress)
+            job.progress = 1.0
+            job.status = JOB_DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            discard_spool(job.video_path)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished"""
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in (JOB_DONE, JOB_FAILED)
+        ]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+@process_singleton
+def get_job_queue():
+    """Process-wide highlight job queue, built on first use"""
+    return HighlightJobQueue(
+        spool_dir=config.HIGHLIGHT_SPOOL_DIR,
+        max_workers=config.HIGHLIGHT_WORKERS,
+        max_pending=config.HIGHLIGHT_MAX_PENDING,
+        chunk_size=config.HIGHLIGHT_SPOOL_CHUNK_BYTES
+    )
@@ -0,0 +1,228 @@
+"""Assemble highlight reels from detected key moments.
+
+Each key moment becomes a window around its timestamp. Overlapping windows
+are merged through an interval tree, the strongest merged segments are kept,
+and the segments are cut from the source video by stream copy at keyframes
+and concatenated, so nothing is re-encoded.
+"""
+import bisect
+import os
+import shutil
+import subprocess
+import tempfile
+
+import config
+
+
+class IntervalTree:
+    """Static interval tree over closed [start, end] intervals.
+
+    Intervals are kept sorted by start in an implicit balanced binary tree,
+    with each node storing the largest end in its subtree, so a query visits
+    only subtrees that can overlap and costs O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        """
+        Args:
+            intervals: Iterable of (start, end, payload) tuples
+        """
+        self._items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._max_end = [0.0] * len(self._items)
+        if self._items:
+            self._build(0, len(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def _build(self, lo, hi):
+        mid = (lo + hi) // 2
+        max_end = self._items[mid][1]
+        if lo < mid:
+            max_end = max(max_end, self._build(lo, mid))
+        if mid + 1 < hi:
+            max_end = max(max_end, self._build(mid + 1, hi))
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start, end):
+        """Payloads of every interval overlapping [start, end]"""
+        found = []
+        stack = [(0, len(self._items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                # Nothing in this subtree ends late enough
+                continue
+            stack.append((lo, mid))
+            item_start, item_end, payload = self._items[mid]
+            if item_start <= end:
+                if item_end >= start:
+                    found.append(payload)
+                # Later starts can still overlap only if they start before `end`
+                stack.append((mid + 1, hi))
+        return found
+
+
+def plan_reel(key_moments, top_n=5, pre_roll=3.0, post_roll=5.0, duration=None):
+    """Choose the reel segments for a list of key moments
+
+    Every moment is widened to [timestamp - pre_roll, timestamp + post_roll];
+    overlapping windows are merged, the top_n merged segments by confidence
+    are kept, and they are returned in playback order.
+
+    Returns:
+        List of dicts with start, end, confidence and the merged moments
+    """
+    if not key_moments:
+        return []
+
+    windows = []
+    for position, moment in enumerate(key_moments):
+        start = max(0.0, float(moment['timestamp']) - pre_roll)
+        end = float(moment['timestamp']) + post_roll
+        if duration is not None:
+            end = min(end, duration)
+        windows.append((start, end, position))
+
+    # Union overlapping windows; each tree query only returns true overlaps
+    tree = IntervalTree(windows)
+    parent = list(range(len(windows)))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for start, end, position in windows:
+        for other in tree.overlapping(start, end):
+            root, other_root = find(position), find(other)
+            if root != other_root:
+                parent[other_root] = root
+
+    groups = {}
+    for start, end, position in windows:
+        groups.setdefault(find(position), []).append(position)
+
+    segments = []
+    for members in groups.values():
+        moments = sorted((key_moments[member] for member in members), key=lambda m: m['timestamp'])
+        segments.append({
+            'start': min(windows[member][0] for member in members),
+            'end': max(windows[member][1] for member in members),
+            'confidence': max(moment['confidence'] for moment in moments),
+            'moments': moments
+        })
+
+    best = sorted(segments, key=lambda segment: segment['confidence'], reverse=True)[:top_n]
+    return sorted(best, key=lambda segment: segment['start'])
+
+
+def align_to_keyframes(segments, keyframes):
+    """Widen segments to start on the keyframe at or before their start
+
+    Stream copy can only begin cleanly on a keyframe; segments that overlap
+    once widened are merged so no footage is repeated.
+    """
+    if not keyframes:
+        return segments
+
+    aligned = []
+    for segment in segments:
+        position = bisect.bisect_right(keyframes, segment['start']) - 1
+        start = keyframes[position] if position >= 0 else 0.0
+        if aligned and start <= aligned[-1]['end']:
+            previous = aligned[-1]
+            previous['end'] = max(previous['end'], segment['end'])
+            previous['confidence'] = max(previous['confidence'], segment['confidence'])
+            previous['moments'] = previous['moments'] + segment['moments']
+            continue
+        aligned.append(dict(segment, start=start))
+    return aligned
+
+
+def _binary(name):
+    path = shutil.which(name)
+    if path is None:
+        raise RuntimeError(f"Building highlight reels needs {name} on the PATH")
+    return path
+
+
+def probe_keyframes(video_path):
+    """Sorted keyframe timestamps (seconds) of a video's first video stream"""
+    output = subprocess.run(
+        [
+            _binary(config.FFPROBE_BINARY), '-v', 'error',
+            '-select_streams', 'v:0',
+            '-skip_frame', 'nokey',
+            '-show_entries', 'frame=pts_time',
+            '-of', 'csv=p=0',
+            video_path
+        ],
+        check=True, capture_output=True, text=True
+    ).stdout
+    keyframes = []
+    for line in output.split():
+        value = line.split(',')[0]
+        if value and value != 'N/A':
+            keyframes.append(float(value))
+    return sorted(keyframes)
+
+
+def extract_segments(video_path, segments, output_path):
+    """Cut segments by stream copy and concatenate them into output_path"""
+    ffmpeg = _binary(config.FFMPEG_BINARY)
+    extension = os.path.splitext(output_path)[1] or '.mp4'
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        parts = []
+        for position, segment in enumerate(segments):
+            part = os.path.join(work_dir, f"part{position:04d}{extension}")
+            # -ss before -i seeks on the container index; with -c copy the cut
+            # lands on the keyframe the segment was aligned to
+            subprocess.run(
+                [
+                    ffmpeg, '-v', 'error', '-y',
+                    '-ss', f"{segment['start']:.3f}",
+                    '-i', video_path,
+                    '-t', f"{segment['end'] - segment['start']:.3f}",
+                    '-c', 'copy',
+                    '-avoid_negative_ts', 'make_zero',
+                    part
+                ],
+                check=True, capture_output=True
+            )
+            parts.append(part)
+
+        concat_list = os.path.join(work_dir, 'parts.txt')
+        with open(concat_list, 'w') as f:
+            f.writelines(f"file '{part}'\n" for part in parts)
+        subprocess.run(
+            [
+                ffmpeg, '-v', 'error', '-y',
+                '-f', 'concat', '-safe', '0',
+                '-i', concat_list,
+                '-c', 'copy',
+                output_path
+            ],
+            check=True, capture_output=True
+        )
+    return output_path
+
+
+def build_reel(video_path, key_moments, output_path, top_n=5, pre_roll=3.0, post_roll=5.0):
+    """Plan, keyframe-align and extract a highlight reel
+
+    Returns:
+        The segments written to output_path, in playback order
+    """
+    segments = plan_reel(key_moments, top_n, pre_roll, post_roll)
+    if not segments:
+        return []
+    segments = align_to_keyframes(segments, probe_keyframes(video_path))
+    extract_segments(video_path, segments, output_path)
+    return segments
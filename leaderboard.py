@@ -0,0 +1,290 @@
+"""Fan leaderboards ranked by points.
+
+Every board is an indexable skiplist ordered by (-points, fan_id): each
+link also stores how many positions it skips, so rank lookups, inserts and
+removals are O(log n) and the top K fans are the first K nodes. One board
+holds all fans and one more is kept per favorite team. The boards are
+saved as gzip-compressed JSON and rebuilt in linear time on load.
+"""
+import atexit
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import config
+from singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+MAX_LEVELS = 24  # enough for ~16 million entries with p = 1/2
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class IndexableSkipList:
+    """Sorted collection of unique keys with O(log n) positional access.
+
+    width[level] of a node is the number of level-0 steps to its next node
+    at that level, or to one past the end when there is none.
+    """
+
+    def __init__(self, keys=()):
+        """
+        Args:
+            keys: Optional keys already in sorted order, linked in O(n)
+        """
+        self._head = _Node(None, MAX_LEVELS)
+        self._size = 0
+        last = [self._head] * MAX_LEVELS
+        last_position = [0] * MAX_LEVELS
+        for position, key in enumerate(keys, 1):
+            node = _Node(key, self._random_levels())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+            self._size = position
+        for level in range(MAX_LEVELS):
+            last[level].width[level] = self._size + 1 - last_position[level]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    @staticmethod
+    def _random_levels():
+        # Position of the lowest set bit is geometric with p = 1/2
+        bits = random.getrandbits(MAX_LEVELS - 1) | (1 << (MAX_LEVELS - 1))
+        return (bits & -bits).bit_length()
+
+    def _predecessors(self, key):
+        """Last node before `key` at every level, and the positions skipped to reach it"""
+        chain = [None] * MAX_LEVELS
+        steps = [0] * MAX_LEVELS
+        node = self._head
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            following = node.next[level]
+            while following is not None and following.key < key:
+                steps[level] += node.width[level]
+                node = following
+                following = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, key):
+        chain, steps_at_level = self._predecessors(key)
+        node = _Node(key, self._random_levels())
+        steps = 0
+        for level in range(len(node.next)):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def index(self, key):
+        """0-based position of `key`; raises KeyError when absent"""
+        node = self._head
+        position = 0
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            following = node.next[level]
+            while following is not None and following.key < key:
+                position += node.width[level]
+                node = following
+                following = node.next[level]
+        following = node.next[0]
+        if following is None or following.key != key:
+            raise KeyError(key)
+        return position
+
+    def slice(self, start, stop):
+        """Keys at positions [start, stop)"""
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+        node = self._head
+        remaining = start + 1
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        keys = []
+        for _ in range(stop - start):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """Global and per-team fan rankings by points"""
+
+    def __init__(self, entries=None):
+        """
+        Args:
+            entries: Optional dict of fan_id -> (points, team)
+        """
+        self._entries = dict(entries or {})
+        self._lock = threading.Lock()
+        # Updates applied, and how many of them the last successful save covered
+        self._updates = 0
+        self._saved_updates = 0
+        keys_by_team = {}
+        for fan_id, (points, team) in self._entries.items():
+            keys_by_team.setdefault(team, []).append((-points, fan_id))
+        for keys in keys_by_team.values():
+            keys.sort()
+        self._global = IndexableSkipList(sorted(key for keys in keys_by_team.values() for key in keys))
+        self._teams = {
+            team: IndexableSkipList(keys) for team, keys in keys_by_team.items() if team
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def changed(self):
+        """Whether there are updates not written by save yet"""
+        return self._updates != self._saved_updates
+
+    def update(self, fan_id, points, team=None):
+        """Set a fan's points and team, moving them on every affected board"""
+        with self._lock:
+            self._place(fan_id, points, team)
+
+    def add(self, fan_id, delta, team=None):
+        """Add `delta` to a fan's points and set their team
+
+        Sessions of the same fan each add what they earned, so none of them
+        overwrites points another one added in the meantime.
+        """
+        with self._lock:
+            previous = self._entries.get(fan_id)
+            self._place(fan_id, (previous[0] if previous else 0) + delta, team)
+
+    def _place(self, fan_id, points, team):
+        previous = self._entries.get(fan_id)
+        if previous == (points, team):
+            return
+        if previous is not None:
+            old_key = (-previous[0], fan_id)
+            self._global.remove(old_key)
+            if previous[1]:
+                self._teams[previous[1]].remove(old_key)
+        key = (-points, fan_id)
+        self._global.insert(key)
+        if team:
+            if team not in self._teams:
+                self._teams[team] = IndexableSkipList()
+            self._teams[team].insert(key)
+        self._entries[fan_id] = (points, team)
+        self._updates += 1
+
+    def rank(self, fan_id, team=None):
+        """1-based rank of a fan overall or within `team`, or None if not ranked there"""
+        with self._lock:
+            entry = self._entries.get(fan_id)
+            if entry is None or (team and entry[1] != team):
+                return None
+            board = self._teams[team] if team else self._global
+            return board.index((-entry[0], fan_id)) + 1
+
+    def top(self, k=10, team=None, offset=0):
+        """List of (rank, fan_id, points) for the best fans overall or within `team`"""
+        with self._lock:
+            board = self._teams.get(team) if team else self._global
+            if board is None:
+                return []
+            return [
+                (offset + position + 1, fan_id, -negative_points)
+                for position, (negative_points, fan_id) in enumerate(board.slice(offset, offset + k))
+            ]
+
+    def team_size(self, team):
+        with self._lock:
+            board = self._teams.get(team)
+            return len(board) if board is not None else 0
+
+    def save(self, path):
+        """Write all entries as gzip-compressed JSON, atomically"""
+        with self._lock:
+            fan_ids = list(self._entries)
+            points = [self._entries[fan_id][0] for fan_id in fan_ids]
+            teams = [self._entries[fan_id][1] for fan_id in fan_ids]
+            updates = self._updates
+        tmp_path = f"{path}.tmp"
+        payload = json.dumps({'fan_ids': fan_ids, 'points': points, 'teams': teams}, separators=(',', ':'))
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        # Only now is the snapshot on disk; updates made while writing stay unsaved
+        with self._lock:
+            self._saved_updates = max(self._saved_updates, updates)
+
+    @classmethod
+    def load(cls, path):
+        """Read a file written by save"""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        return cls({
+            fan_id: (points, team)
+            for fan_id, points, team in zip(payload['fan_ids'], payload['points'], payload['teams'])
+        })
+
+
+def autosave(target, path, interval):
+    """Save `target` to path every `interval` seconds while it has changes; runs forever"""
+    while True:
+        time.sleep(interval)
+        if target.changed:
+            try:
+                target.save(path)
+            except Exception:
+                # Still changed, so the next interval tries again
+                logger.exception("Autosave to %s failed", path)
+
+
+@process_singleton
+def get_leaderboard():
+    """Process-wide leaderboard, loaded from config.LEADERBOARD_PATH on first use"""
+    path = config.LEADERBOARD_PATH
+    leaderboard = Leaderboard.load(path) if os.path.exists(path) else Leaderboard()
+    threading.Thread(
+        target=autosave, args=(leaderboard, path, config.LEADERBOARD_SAVE_SECONDS),
+        name='leaderboard-save', daemon=True
+    ).start()
+    atexit.register(lambda: leaderboard.changed and leaderboard.save(path))
+    return leaderboard
@@ -0,0 +1,69 @@
+import numpy as np
+
+from data_processor import METRIC_COLUMNS
+
+# (low, high, decimals) the simulated feed samples new video metrics from
+METRIC_RANGES = {
+    'pitch_velocity': (88, 103, 1),
+    'exit_velocity': (85, 118, 1),
+    'launch_angle': (10, 45, 1),
+    'spin_rate': (2000, 3000, 0),
+    'distance': (300, 450, 1)
+}
+
+
+def simulate_live_feed(games_df, batches=None, events_per_batch=20, final_probability=0.01, seed=None):
+    """Yield batches of simulated live game events for offline load testing
+
+    Events only target games that are currently Live. A game turning Final
+    stops receiving events, and the feed ends once no live games are left or
+    after `batches` batches.
+
+    Args:
+        games_df: Games frame to draw live games from
+        batches: Number of batches to yield, or None to run until every game is Final
+        events_per_batch: Events in each batch
+        final_probability: Chance per event that its game ends
+        seed: Seed for reproducible feeds
+
+    Yields:
+        Lists of event dicts accepted by MLBDataProcessor.apply_events
+    """
+    rng = np.random.default_rng(seed)
+    live = games_df.loc[games_df['status'] == 'Live', ['game_id', 'home_score', 'away_score']]
+    scores = {
+        game_id: [home, away]
+        for game_id, home, away in live.itertuples(index=False)
+    }
+
+    produced = 0
+    while scores and (batches is None or produced < batches):
+        game_ids = list(scores)
+        targets = rng.choice(game_ids, events_per_batch)
+        kinds = rng.choice(['score', 'metrics', 'status'], events_per_batch, p=[0.3, 0.65, 0.05])
+
+        events = []
+        for game_id, kind in zip(targets.tolist(), kinds.tolist()):
+            if game_id not in scores:
+                continue
+            if kind == 'score':
+                side = rng.integers(0, 2)
+                scores[game_id][side] += 1
+                events.append({
+                    'game_id': game_id,
+                    'type': 'score',
+                    'home_score': scores[game_id][0],
+                    'away_score': scores[game_id][1]
+                })
+            elif kind == 'metrics':
+                event = {'game_id': game_id, 'type': 'metrics'}
+                for column in METRIC_COLUMNS:
+                    low, high, decimals = METRIC_RANGES[column]
+                    event[column] = round(float(rng.uniform(low, high)), decimals)
+                events.append(event)
+            elif rng.random() < final_probability / 0.05:
+                events.append({'game_id': game_id, 'type': 'status', 'status': 'Final'})
+                del scores[game_id]
+
+        produced += 1
+        yield events
@@ -1,5 +1,6 @@
 import streamlit as st
-from data_processor import MLBDataProcessor
+import config
+from data_processor import get_data_store
 from visualizations import (
     create_batting_avg_chart,
     create_hr_leaderboard,
@@ -11,6 +12,7 @@ from news_feed import NewsFeeder
 from styles import apply_custom_styles, create_stat_card
 from highlight_generator import HighlightGenerator
 from outfit_recommender import OutfitRecommender
+from predictions import CORRECT_PICK_POINTS, get_prediction_book
 
 # Page configuration
 st.set_page_config(
@@ -21,11 +23,9 @@ st.set_page_config(
 
 # Initialize components
 apply_custom_styles()
-data_processor = MLBDataProcessor()
+data_snapshot = get_data_store().snapshot()
+data_processor = data_snapshot.processor
 fan_system = FanEngagementSystem()
-news_feeder = NewsFeeder()
-highlight_gen = HighlightGenerator()
-outfit_recommender = OutfitRecommender()
 
 # Header
 st.title("⚾ Baseball Fan Hub")
@@ -41,24 +41,15 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Top navigation with improved styling
-tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-    "🏟️ Live Dashboard", 
-    "👤 Player Stories", 
-    "📊 Video Analysis",
-    "🏆 Fan Zone",
-    "📰 News Feed",
-    "🎬 Highlights",
-    "👕 Outfit Recommender"
-])
-
-with tab1:
+def render_live_dashboard():
+    """Live games, AI insights and league charts"""
     st.header("Live Games & Statistics")
 
     # Live games section
     st.subheader("Live Games")
     live_games = data_processor.get_live_games()
     if not live_games.empty:
+        live_insights = data_processor.get_live_insights(live_games['game_id'].tolist())
         for _, game in live_games.iterrows():
             st.markdown(f"""
                 <div class="stat-card">
@@ -71,7 +62,7 @@ with tab1:
             """, unsafe_allow_html=True)
 
             # Real-time insights
-            insights = data_processor.get_real_time_insights(game['game_id'])
+            insights = live_insights[game['game_id']]
             if insights:
                 st.markdown("### 🎯 AI Insights")
                 for insight in insights:
@@ -84,13 +75,19 @@ with tab1:
 
     with col1:
         st.plotly_chart(
-            create_batting_avg_chart(data_processor.get_top_players('avg')),
+            create_batting_avg_chart(
+                data_processor.get_top_players('avg'),
+                data_version=data_snapshot.version
+            ),
             use_container_width=True
         )
 
     with col2:
         st.plotly_chart(
-            create_hr_leaderboard(data_processor.get_top_players('hr')),
+            create_hr_leaderboard(
+                data_processor.get_top_players('hr'),
+                data_version=data_snapshot.version
+            ),
             use_container_width=True
         )
 
@@ -99,7 +96,8 @@ with tab1:
         use_container_width=True
     )
 
-with tab2:
+def render_player_stories():
+    """Team and player picker with player stories"""
     st.header("Player Stories & Profiles")
 
     # Team and player selection
@@ -145,7 +143,8 @@ with tab2:
         for highlight in player_data['video_highlights']:
             st.markdown(f"🎥 {highlight}")
 
-with tab3:
+def render_video_analysis():
+    """Per-game video metrics"""
     st.header("Video Analysis Dashboard")
 
     # Game selection for video analysis
@@ -179,11 +178,15 @@ with tab3:
 
         # Video metrics chart
         st.plotly_chart(
-            create_video_metrics_chart(metrics),
+            create_video_metrics_chart(
+                metrics,
+                league_average=data_processor.get_league_metric_averages()
+            ),
             use_container_width=True
         )
 
-with tab4:
+def render_fan_zone():
+    """Fan points, badges and daily challenge"""
     st.markdown("""
         <div style="text-align: center; margin-bottom: 2rem;">
             <h2 style="color: #9C27B0;">🏆 Fan Zone</h2>
@@ -281,6 +284,68 @@ with tab4:
             with badge_cols[idx % 2]:
                 create_badge_card(badge, info['icon'], info['description'])
 
+    # Leaderboard
+    st.markdown("""
+        <div style="margin: 2rem 0;">
+            <h2 style="color: #9C27B0; text-align: center;">🏅 Leaderboard</h2>
+        </div>
+    """, unsafe_allow_html=True)
+
+    standing = fan_system.get_leaderboard_standing()
+    favorite_team = st.session_state.get('favorite_team')
+    boards = [("All Fans", None, standing['rank'], standing['fans'])]
+    if favorite_team:
+        boards.append((f"{favorite_team} Fans", favorite_team, standing['team_rank'], standing['team_fans']))
+    for column, (title, team, rank, total) in zip(st.columns(2), boards):
+        with column:
+            st.markdown(f"### {title}")
+            if rank:
+                st.markdown(f"Your rank: **#{rank:,}** of {total:,}")
+            for position, fan_id, points in fan_system.get_top_fans(10, team):
+                name = "You" if fan_id == fan_system.fan_id else f"Fan {fan_id[:6]}"
+                st.markdown(f"{position}. {name} — {points:,} points")
+
+    community = fan_system.get_community_activity()
+    if community:
+        st.caption("Today across all fans: " + " · ".join(
+            f"{count:,} {counter.replace('_', ' ')}" for counter, count in community.items()
+        ))
+
+    # Game predictions
+    st.markdown("""
+        <div style="margin: 2rem 0;">
+            <h2 style="color: #9C27B0; text-align: center;">🔮 Game Predictions</h2>
+        </div>
+    """, unsafe_allow_html=True)
+
+    prediction_book = get_prediction_book()
+    upcoming = data_processor.games_df[data_processor.games_df['status'] == 'Scheduled']
+    # A game reverted to Scheduled by a source reload stays closed once settled
+    upcoming = upcoming[~upcoming['game_id'].map(prediction_book.is_settled).astype(bool)]
+    if upcoming.empty:
+        st.info("No upcoming games to predict right now.")
+    else:
+        games = {
+            f"{game.away_team} @ {game.home_team} (Game {game.game_id})": game
+            for game in upcoming.itertuples()
+        }
+        choice = st.selectbox("Pick a game", list(games))
+        game = games[choice]
+        current_pick = fan_system.get_prediction(game.game_id)
+        side = st.radio(
+            "Who wins?", ['home', 'away'],
+            index=['home', 'away'].index(current_pick) if current_pick else 0,
+            format_func=lambda side: game.home_team if side == 'home' else game.away_team,
+            horizontal=True
+        )
+        if st.button("Lock In Prediction"):
+            try:
+                fan_system.make_prediction(game.game_id, side)
+            except ValueError as e:
+                st.warning(f"Predictions for this game are closed: {e}")
+            else:
+                st.success(f"Prediction saved! +{CORRECT_PICK_POINTS} points if you're right")
+
     # Daily Challenge with enhanced styling
     st.markdown("""
         <div style="margin: 2rem 0;">
@@ -288,7 +353,7 @@ with tab4:
         </div>
     """, unsafe_allow_html=True)
 
-    challenge = fan_system.generate_challenge()
+    challenge = fan_system.get_daily_challenge()
     st.markdown(f"""
         <div class="stat-card" style="text-align: center;">
             <h3 style="color: #9C27B0; margin-bottom: 1rem;">Today's Challenge</h3>
@@ -300,14 +365,18 @@ with tab4:
         </div>
     """, unsafe_allow_html=True)
 
-    if st.button("Complete Challenge"):
+    if fan_system.is_challenge_completed():
+        st.success("✅ Challenge completed! Come back tomorrow for a new one.")
+    elif st.button("Complete Challenge"):
         points = challenge['points'] * streak_info['points_multiplier']
-        fan_system.add_points(points, challenge['task'])
-        st.balloons()
-        st.success(f"Congratulations! You earned {points} points!")
+        if fan_system.complete_challenge(points):
+            st.balloons()
+            st.success(f"Congratulations! You earned {points} points!")
         st.rerun()
 
-with tab5:
+def render_news_feed():
+    """Latest news items"""
+    news_feeder = NewsFeeder()
     st.header("Latest News")
 
     # Display news feed
@@ -319,11 +388,39 @@ with tab5:
             </div>
         """, unsafe_allow_html=True)
 
-with tab6:
-    highlight_gen.render_highlight_ui()
+def render_highlights():
+    """AI highlight generator"""
+    HighlightGenerator().render_highlight_ui()
+
+def render_outfit_recommender():
+    """Game day outfit recommender"""
+    OutfitRecommender().render_outfit_ui()
 
-with tab7:
-    outfit_recommender.render_outfit_ui()
+# Top navigation with improved styling
+SECTIONS = {
+    "🏟️ Live Dashboard": render_live_dashboard,
+    "👤 Player Stories": render_player_stories,
+    "📊 Video Analysis": render_video_analysis,
+    "🏆 Fan Zone": render_fan_zone,
+    "📰 News Feed": render_news_feed,
+    "🎬 Highlights": render_highlights,
+    "👕 Outfit Recommender": render_outfit_recommender
+}
+
+if config.LAZY_TABS:
+    # Only the selected section runs its queries and builds its figures
+    active_section = st.radio(
+        "Section",
+        list(SECTIONS),
+        horizontal=True,
+        key='active_section',
+        label_visibility='collapsed'
+    )
+    SECTIONS[active_section]()
+else:
+    for tab, render_section in zip(st.tabs(list(SECTIONS)), SECTIONS.values()):
+        with tab:
+            render_section()
 
 # Footer
 st.markdown("---")
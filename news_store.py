@@ -0,0 +1,238 @@
+"""Process-wide news store fed by pluggable sources.
+
+A background refresher polls every source on an interval and merges new
+items into one list kept in timestamp order. Items are deduplicated by
+(source, item id), or by a hash of their content when the source gives no
+id, and the list is capped at `max_items`, dropping the oldest. After each merge an immutable newest-first snapshot is published,
+which every session reads without locking.
+"""
+import bisect
+import hashlib
+import json
+import os
+import random
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import config
+from singleton import process_singleton
+
+NewsItem = namedtuple('NewsItem', ['timestamp', 'content', 'source', 'key'])
+
+NEWS_TEMPLATES = [
+    "🎯 {player} demonstrates exceptional power hitting in latest analysis session",
+    "⭐ Rising star {player} sets new personal records in today's metrics",
+    "📊 Baseball Hub Analysis: {team}'s innovative defensive strategies paying dividends",
+    "🏟️ Fan engagement hits record levels at {team}'s latest home game",
+    "🔄 Real-time insights: {team} showing strong improvement in key metrics",
+    "🏆 {player} unlocks rare achievement milestone in fan engagement system",
+    "📈 Baseball Hub Stats: {team} leads in advanced analytics metrics",
+    "🌟 Featured Story: {player}'s journey from rookie to analytics superstar",
+    "🎮 Fan Zone Update: New interactive challenges available for {team} fans",
+    "📱 Baseball Hub Feature: {player}'s performance metrics break new ground"
+]
+
+NEWS_TEAMS = ['Yankees', 'Red Sox', 'Cubs', 'Dodgers', 'Giants']
+NEWS_PLAYERS = ['Mike Trout', 'Shohei Ohtani', 'Juan Soto', 'Mookie Betts', 'Aaron Judge']
+
+
+def content_hash(content):
+    """SHA-256 of a news item's whitespace-normalized text"""
+    return hashlib.sha256(' '.join(content.split()).encode()).hexdigest()
+
+
+class NewsSource:
+    """Interface for news sources.
+
+    fetch returns an iterable of dicts with a datetime 'timestamp', a
+    'content' string and optionally an 'id' unique within the source;
+    items already seen are dropped by the store.
+    """
+
+    name = None
+
+    def fetch(self):
+        raise NotImplementedError
+
+
+class SampleNewsSource(NewsSource):
+    """Generated headlines: a backfill of `backfill` items, then a few per fetch
+
+    The templates only combine into a few dozen distinct headlines, so each
+    item carries a running story number as its id.
+    """
+
+    name = 'sample'
+
+    def __init__(self, seed=None, backfill=10, per_fetch=1):
+        self.rng = random.Random(seed)
+        self.backfill = backfill
+        self.per_fetch = per_fetch
+        self._fetched = False
+        self._stories = 0
+
+    def _story(self, timestamp):
+        self._stories += 1
+        headline = self.rng.choice(NEWS_TEMPLATES).format(
+            team=self.rng.choice(NEWS_TEAMS),
+            player=self.rng.choice(NEWS_PLAYERS)
+        )
+        return {'timestamp': timestamp, 'content': headline, 'id': self._stories}
+
+    def fetch(self):
+        now = datetime.now()
+        if not self._fetched:
+            self._fetched = True
+            return [self._story(now - timedelta(minutes=i * 30)) for i in range(self.backfill)]
+        return [self._story(now) for _ in range(self.per_fetch)]
+
+
+class JSONFileNewsSource(NewsSource):
+    """News items from a local JSON file, for offline use
+
+    The file holds a list of objects with 'content', an ISO 8601
+    'timestamp' and an optional 'id'. It is only re-read after its
+    modification time changes.
+    """
+
+    name = 'file'
+
+    def __init__(self, path=None):
+        self.path = path or config.NEWS_FILE_PATH
+        self._mtime = None
+
+    def fetch(self):
+        if not self.path:
+            return []
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return []
+        if mtime == self._mtime:
+            return []
+        with open(self.path) as f:
+            entries = json.load(f)
+        self._mtime = mtime
+
+        items = []
+        for entry in entries:
+            try:
+                timestamp = datetime.fromisoformat(entry['timestamp'])
+                content = str(entry['content'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if timestamp.tzinfo is not None:
+                # Other sources use naive local time
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            item = {'timestamp': timestamp, 'content': content}
+            if entry.get('id') is not None:
+                item['id'] = str(entry['id'])
+            items.append(item)
+        return items
+
+
+NEWS_SOURCES = {
+    SampleNewsSource.name: SampleNewsSource,
+    JSONFileNewsSource.name: JSONFileNewsSource
+}
+
+
+def create_news_sources(names=None):
+    """Instantiate registered news sources, defaulting to config.NEWS_SOURCES"""
+    names = names or [name.strip() for name in config.NEWS_SOURCES.split(',') if name.strip()]
+    for name in names:
+        if name not in NEWS_SOURCES:
+            raise ValueError(f"Unknown news source: {name}")
+    return [
+        NEWS_SOURCES[name](seed=config.DATA_SEED) if name == SampleNewsSource.name else NEWS_SOURCES[name]()
+        for name in names
+    ]
+
+
+class NewsStore:
+    """Bounded, timestamp-ordered, deduplicated news items shared by all sessions"""
+
+    def __init__(self, sources, max_items=200, refresh_seconds=60):
+        self.sources = sources
+        self.max_items = max_items
+        self.refresh_seconds = refresh_seconds
+        # Oldest first, so new items usually append at the end
+        self._items = []
+        self._keys = []
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._snapshot = ()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def snapshot(self):
+        """Current items, newest first, as an immutable tuple"""
+        return self._snapshot
+
+    def latest(self, limit=5):
+        return self._snapshot[:limit]
+
+    def merge(self, items, source=None):
+        """Insert new items in timestamp order; returns how many were added"""
+        added = 0
+        with self._lock:
+            for item in items:
+                if not isinstance(item.get('timestamp'), datetime) or not isinstance(item.get('content'), str):
+                    continue
+                digest = content_hash(item['content'])
+                key = (source, item['id']) if item.get('id') is not None else (None, digest)
+                if key in self._seen:
+                    continue
+                order = (item['timestamp'], digest)
+                position = bisect.bisect_right(self._keys, order)
+                self._keys.insert(position, order)
+                self._items.insert(position, NewsItem(item['timestamp'], item['content'], source, key))
+                self._seen.add(key)
+                added += 1
+
+            overflow = len(self._items) - self.max_items
+            if overflow > 0:
+                for dropped in self._items[:overflow]:
+                    self._seen.discard(dropped.key)
+                del self._items[:overflow]
+                del self._keys[:overflow]
+            if added:
+                self._snapshot = tuple(reversed(self._items))
+        return added
+
+    def refresh(self):
+        """Poll every source once; a failing source is skipped until the next refresh"""
+        added = 0
+        for source in self.sources:
+            try:
+                added += self.merge(source.fetch(), source.name)
+            except Exception:
+                # One broken source or malformed item must not stop the refresher thread
+                continue
+        return added
+
+    def start(self):
+        """Fill the store now, then keep refreshing it on a daemon thread"""
+        self.refresh()
+        if self.refresh_seconds and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='news-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            self.refresh()
+
+
+@process_singleton
+def get_news_store():
+    """Process-wide news store, filled and started on first use"""
+    return NewsStore(
+        create_news_sources(),
+        max_items=config.NEWS_MAX_ITEMS,
+        refresh_seconds=config.NEWS_REFRESH_SECONDS
+    ).start()
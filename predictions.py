@@ -0,0 +1,244 @@
+"""Fan predictions on game winners, settled in bulk when games go Final.
+
+Picks for a game are held column-wise: a growable int32 array of fan
+indexes and an int8 array of picked sides. Settling a game compares the
+whole pick column with the winner in one NumPy pass and adds the awards to
+per-fan pending totals, which each fan's session collects on its next run.
+Open picks, settled games and pending totals are saved to
+config.PREDICTIONS_PATH in the background, so a restart loses none of them.
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+import config
+from leaderboard import autosave
+from singleton import process_singleton
+
+HOME, AWAY = 0, 1
+SIDES = {'home': HOME, 'away': AWAY}
+
+# Points for each correct pick
+CORRECT_PICK_POINTS = 25
+
+Settlement = namedtuple('Settlement', ['game_id', 'winner', 'picks', 'correct'])
+PredictionResults = namedtuple('PredictionResults', ['points', 'settled', 'correct'])
+
+
+class _GamePicks:
+    """Open picks of one game, one row per fan"""
+
+    __slots__ = ('fans', 'sides', 'size', 'rows')
+
+    def __init__(self, capacity=64):
+        self.fans = np.empty(capacity, dtype=np.int32)
+        self.sides = np.empty(capacity, dtype=np.int8)
+        self.size = 0
+        # fan index -> row, so a fan changing their pick overwrites it in place
+        self.rows = {}
+
+    def put(self, fan, side):
+        row = self.rows.get(fan)
+        if row is None:
+            if self.size == len(self.fans):
+                self.fans = np.resize(self.fans, 2 * self.size)
+                self.sides = np.resize(self.sides, 2 * self.size)
+            row = self.rows[fan] = self.size
+            self.fans[row] = fan
+            self.size += 1
+        self.sides[row] = side
+
+    def get(self, fan):
+        row = self.rows.get(fan)
+        return None if row is None else int(self.sides[row])
+
+
+class PredictionBook:
+    """Open picks per game_id and pending settlement results per fan"""
+
+    def __init__(self, points_per_correct=CORRECT_PICK_POINTS):
+        self.points_per_correct = points_per_correct
+        self._games = {}
+        self._settled = set()
+        self._fan_index = {}
+        self._pending = np.zeros((3, 64), dtype=np.int64)  # points, settled, correct
+        self._lock = threading.Lock()
+        # Changes made, and how many of them the last successful save covered
+        self._updates = 0
+        self._saved_updates = 0
+
+    @property
+    def changed(self):
+        """Whether there are changes not written by save yet"""
+        return self._updates != self._saved_updates
+
+    def is_settled(self, game_id):
+        return int(game_id) in self._settled
+
+    def _fan(self, fan_id):
+        fan = self._fan_index.get(fan_id)
+        if fan is None:
+            fan = self._fan_index[fan_id] = len(self._fan_index)
+            if fan == self._pending.shape[1]:
+                grown = np.zeros((3, 2 * fan), dtype=np.int64)
+                grown[:, :fan] = self._pending
+                self._pending = grown
+        return fan
+
+    def place(self, fan_id, game_id, side):
+        """Record or change a fan's pick ('home' or 'away') for a game"""
+        if side not in SIDES:
+            raise ValueError(f"Unknown side: {side}")
+        # Ids from games_df are numpy integers, which save could not serialize
+        game_id = int(game_id)
+        with self._lock:
+            if game_id in self._settled:
+                raise ValueError(f"Game {game_id} is already settled")
+            picks = self._games.get(game_id)
+            if picks is None:
+                picks = self._games[game_id] = _GamePicks()
+            picks.put(self._fan(fan_id), SIDES[side])
+            self._updates += 1
+
+    def pick(self, fan_id, game_id):
+        """The fan's open pick for a game, or None"""
+        with self._lock:
+            picks = self._games.get(int(game_id))
+            fan = self._fan_index.get(fan_id)
+            if picks is None or fan is None:
+                return None
+            side = picks.get(fan)
+        return None if side is None else ('home', 'away')[side]
+
+    def open_picks(self, game_id):
+        with self._lock:
+            picks = self._games.get(int(game_id))
+            return picks.size if picks is not None else 0
+
+    def settle(self, game_id, winner):
+        """Settle every pick of a game in one pass
+
+        Args:
+            winner: HOME, AWAY, or None for a tie (no pick is correct)
+
+        Returns:
+            Settlement, or None if the game had no open picks
+        """
+        game_id = int(game_id)
+        with self._lock:
+            picks = self._games.pop(game_id, None)
+            if game_id not in self._settled:
+                self._settled.add(game_id)
+                self._updates += 1
+            if picks is None:
+                return None
+            fans = picks.fans[:picks.size]
+            correct = picks.sides[:picks.size] == winner if winner is not None else np.zeros(picks.size, dtype=bool)
+            # A fan has at most one row per game, so fancy-index += never drops repeats
+            self._pending[0, fans] += correct * self.points_per_correct
+            self._pending[1, fans] += 1
+            self._pending[2, fans] += correct
+            return Settlement(game_id, winner, picks.size, int(correct.sum()))
+
+    def settle_final_games(self, games_df, game_ids=None):
+        """Settle the open picks of every Final game in games_df
+
+        Args:
+            game_ids: Optional subset to consider, e.g. the game_ids an
+                apply_events batch changed
+
+        Returns:
+            List of Settlements
+        """
+        with self._lock:
+            open_games = list(self._games)
+        if not open_games:
+            return []
+        candidates = open_games if game_ids is None else [game_id for game_id in open_games if game_id in game_ids]
+        final = games_df[games_df['game_id'].isin(candidates) & (games_df['status'] == 'Final')]
+        if final.empty:
+            return []
+
+        home = final['home_score'].to_numpy()
+        away = final['away_score'].to_numpy()
+        winners = np.where(home > away, HOME, np.where(away > home, AWAY, -1))
+        settlements = []
+        for game_id, winner in zip(final['game_id'].tolist(), winners.tolist()):
+            settlement = self.settle(game_id, winner if winner >= 0 else None)
+            if settlement is not None:
+                settlements.append(settlement)
+        return settlements
+
+    def collect(self, fan_id):
+        """Take a fan's pending results, resetting them to zero
+
+        Returns:
+            PredictionResults of (points, settled picks, correct picks)
+        """
+        with self._lock:
+            fan = self._fan_index.get(fan_id)
+            if fan is None:
+                return PredictionResults(0, 0, 0)
+            results = PredictionResults(*self._pending[:, fan].tolist())
+            if results.settled:
+                self._pending[:, fan] = 0
+                self._updates += 1
+        return results
+
+    def save(self, path):
+        """Write picks, settled games and pending results as gzip-compressed JSON, atomically"""
+        with self._lock:
+            fan_ids = list(self._fan_index)
+            pending = self._pending[:, :len(fan_ids)]
+            waiting = np.flatnonzero(pending[1])
+            payload = json.dumps({
+                'fan_ids': fan_ids,
+                'games': [
+                    [game_id, picks.fans[:picks.size].tolist(), picks.sides[:picks.size].tolist()]
+                    for game_id, picks in self._games.items()
+                ],
+                'settled': sorted(self._settled),
+                'pending': [waiting.tolist()] + pending[:, waiting].tolist()
+            }, separators=(',', ':'))
+            updates = self._updates
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._saved_updates = max(self._saved_updates, updates)
+
+    @classmethod
+    def load(cls, path, points_per_correct=CORRECT_PICK_POINTS):
+        """Read a file written by save"""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        book = cls(points_per_correct)
+        for fan_id in payload['fan_ids']:
+            book._fan(fan_id)
+        for game_id, fans, sides in payload['games']:
+            picks = book._games[game_id] = _GamePicks(max(64, len(fans)))
+            for fan, side in zip(fans, sides):
+                picks.put(fan, side)
+        book._settled = set(payload['settled'])
+        waiting, points, settled, correct = payload['pending']
+        book._pending[:, waiting] = [points, settled, correct]
+        return book
+
+
+@process_singleton
+def get_prediction_book():
+    """Process-wide prediction book, loaded from config.PREDICTIONS_PATH on first use"""
+    path = config.PREDICTIONS_PATH
+    book = PredictionBook.load(path) if os.path.exists(path) else PredictionBook()
+    threading.Thread(
+        target=autosave, args=(book, path, config.PREDICTIONS_SAVE_SECONDS),
+        name='predictions-save', daemon=True
+    ).start()
+    atexit.register(lambda: book.changed and book.save(path))
+    return book
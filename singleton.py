@@ -0,0 +1,36 @@
+"""Process-wide objects built lazily on first use.
+
+Shared stores, queues and ledgers live for the whole server process and
+are used from every session thread; process_singleton builds each one
+exactly once, the first time its getter is called.
+"""
+import functools
+import threading
+
+
+def process_singleton(factory):
+    """Decorate a zero-argument factory so every call returns one shared instance
+
+    The getter's cache_clear(instance=None) forgets the instance so the next
+    call builds a new one; given an instance, it only clears if that is the
+    one currently shared, so concurrent callers replace a broken object once.
+    """
+    lock = threading.Lock()
+    built = []
+
+    @functools.wraps(factory)
+    def get():
+        if not built:
+            with lock:
+                # Another thread may have built it while we waited
+                if not built:
+                    built.append(factory())
+        return built[0]
+
+    def cache_clear(instance=None):
+        with lock:
+            if built and (instance is None or built[0] is instance):
+                built.clear()
+
+    get.cache_clear = cache_clear
+    return get
@@ -0,0 +1,84 @@
+"""Daily visit streaks.
+
+A fan's streak advances at most once per calendar day in the fan's time
+zone. advance_streak is a pure O(1) step from the persisted (streak,
+last_seen) pair; StreakLedger remembers the last day each fan was paid a
+streak bonus, so sessions open in several tabs cannot pay it twice.
+"""
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import config
+from singleton import process_singleton
+
+# Bonus points per day of streak, paid when the streak grows
+STREAK_BONUS_PER_DAY = 5
+
+StreakUpdate = namedtuple('StreakUpdate', ['streak', 'last_seen', 'bonus'])
+
+
+@lru_cache(maxsize=64)
+def _zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(config.FAN_TIMEZONE)
+
+
+def fan_today(timezone=None):
+    """Current calendar date in an IANA time zone, defaulting to config.FAN_TIMEZONE"""
+    return datetime.now(_zone(timezone or config.FAN_TIMEZONE)).date()
+
+
+def advance_streak(streak, last_seen, today, bonus_per_day=STREAK_BONUS_PER_DAY):
+    """Streak after a visit on `today`
+
+    A visit on the day after last_seen extends the streak and earns
+    streak * bonus_per_day; a later gap restarts it at 1. Repeat visits on
+    the same day, or a date behind last_seen after a time zone change,
+    leave it unchanged.
+
+    Returns:
+        StreakUpdate of (streak, last_seen, bonus)
+    """
+    if last_seen is None:
+        return StreakUpdate(1, today, 0)
+    days = (today - last_seen).days
+    if days <= 0:
+        return StreakUpdate(streak, last_seen, 0)
+    if days == 1:
+        return StreakUpdate(streak + 1, today, (streak + 1) * bonus_per_day)
+    return StreakUpdate(1, today, 0)
+
+
+class StreakLedger:
+    """Last day a streak bonus was paid, per fan paid since yesterday"""
+
+    def __init__(self):
+        self._paid = {}
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def claim(self, fan_id, day):
+        """True exactly once per fan and day"""
+        with self._lock:
+            if self._paid.get(fan_id) == day:
+                return False
+            self._paid[fan_id] = day
+            if self._latest is None or day > self._latest:
+                self._latest = day
+                self._prune(day - timedelta(days=1))
+            return True
+
+    def _prune(self, oldest):
+        # Fans in time zones behind can still be on yesterday; older days cannot repeat
+        self._paid = {fan_id: paid for fan_id, paid in self._paid.items() if paid >= oldest}
+
+
+@process_singleton
+def get_streak_ledger():
+    """Process-wide streak bonus ledger, built on first use"""
+    return StreakLedger()
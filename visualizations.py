@@ -1,7 +1,102 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
 
+import config
+
+
+class FigureCache:
+    """Bounded LRU cache of built Plotly figures.
+
+    Cached figures are shared between sessions and must not be mutated by
+    callers.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._figures),
+                'max_entries': self.max_entries
+            }
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+figure_cache = FigureCache(max_entries=config.FIGURE_CACHE_SIZE)
+
+
+def _content_key(data, columns):
+    """Hash of the parts of a chart's input that affect the figure"""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, pd.DataFrame):
+        frame = data[columns] if columns else data
+        digest.update(','.join(map(str, frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    else:
+        digest.update(repr(sorted(data.items())).encode())
+    return digest.hexdigest()
+
+
+def cached_figure(columns=None):
+    """Memoize a chart builder in figure_cache
+
+    The cache key is the builder name plus either an explicit `data_version`
+    keyword supplied by the caller or a content hash of `columns` of the
+    input frame (or of the input dict).
+    """
+    def decorator(build):
+        @functools.wraps(build)
+        def wrapper(data, *args, data_version=None, **kwargs):
+            if data_version is None:
+                data_key = _content_key(data, columns)
+            else:
+                data_key = ('version', data_version)
+            key = (build.__name__, data_key, repr(args), repr(sorted(kwargs.items())))
+            return figure_cache.get_or_build(key, lambda: build(data, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def get_figure_cache_stats():
+    """Hit/miss counters and size of the shared figure cache"""
+    return figure_cache.stats()
+
+
+@cached_figure(columns=['name', 'avg'])
 def create_batting_avg_chart(players_df):
     fig = px.bar(
         players_df.head(10),
@@ -30,6 +125,7 @@ def create_batting_avg_chart(players_df):
     )
     return fig
 
+@cached_figure(columns=['name', 'hr'])
 def create_hr_leaderboard(players_df):
     fig = px.bar(
         players_df.nlargest(10, 'hr'),
@@ -58,51 +154,40 @@ def create_hr_leaderboard(players_df):
     )
     return fig
 
+@cached_figure(columns=['home_team', 'away_team', 'home_score', 'away_score'])
 def create_team_comparison(games_df):
-    team_stats = {}
-
-    for team in games_df['home_team'].unique():
-        team_games = games_df[
-            (games_df['home_team'] == team) | 
-            (games_df['away_team'] == team)
-        ]
-
-        wins = len(team_games[
-            ((team_games['home_team'] == team) & 
-             (team_games['home_score'] > team_games['away_score'])) |
-            ((team_games['away_team'] == team) & 
-             (team_games['away_score'] > team_games['home_score']))
-        ])
-
-        total_games = len(team_games)
-        win_pct = (wins / total_games) * 100 if total_games > 0 else 0
-
-        team_stats[team] = {
-            'wins': wins,
-            'total_games': total_games,
-            'win_pct': win_pct
-        }
-
-    fig = go.Figure()
+    # One row per team per game, so home and away games are counted alike
+    appearances = pd.DataFrame({
+        'team': pd.concat([games_df['home_team'], games_df['away_team']], ignore_index=True),
+        'won': pd.concat([
+            games_df['home_score'] > games_df['away_score'],
+            games_df['away_score'] > games_df['home_score']
+        ], ignore_index=True)
+    })
+    team_stats = appearances.groupby('team', sort=True)['won'].agg(
+        wins='sum',
+        total_games='size'
+    )
+    team_stats['win_pct'] = team_stats['wins'] / team_stats['total_games'] * 100
 
-    colors = px.colors.sequential.Viridis
-
-    for i, (team, stats) in enumerate(team_stats.items()):
-        fig.add_trace(go.Bar(
-            name=team,
-            x=[team],
-            y=[stats['wins']],
-            text=[f"{stats['wins']} W<br>{stats['win_pct']:.1f}%"],
-            textposition='auto',
-            marker_color=colors[i],
-            hovertemplate=(
-                f"<b>{team}</b><br>"
-                f"Wins: {stats['wins']}<br>"
-                f"Win %: {stats['win_pct']:.1f}%<br>"
-                f"Games: {stats['total_games']}"
-                "<extra></extra>"
-            )
-        ))
+    fig = go.Figure(go.Bar(
+        x=team_stats.index,
+        y=team_stats['wins'],
+        text=[
+            f"{wins} W<br>{win_pct:.1f}%"
+            for wins, win_pct in zip(team_stats['wins'], team_stats['win_pct'])
+        ],
+        textposition='auto',
+        customdata=team_stats[['win_pct', 'total_games']].to_numpy(),
+        marker=dict(color=team_stats['wins'], colorscale='Viridis'),
+        hovertemplate=(
+            "<b>%{x}</b><br>"
+            "Wins: %{y}<br>"
+            "Win %: %{customdata[0]:.1f}%<br>"
+            "Games: %{customdata[1]}"
+            "<extra></extra>"
+        )
+    ))
 
     fig.update_layout(
         title='Team Performance Analysis',
@@ -119,17 +204,25 @@ def create_team_comparison(games_df):
     )
     return fig
 
-def create_video_metrics_chart(metrics):
-    """Create an enhanced radar chart for video metrics visualization"""
+@cached_figure()
+def create_video_metrics_chart(metrics, league_average=None):
+    """Create an enhanced radar chart for video metrics visualization
+
+    Args:
+        metrics: Dict of video metrics for the selected game
+        league_average: Optional dict of league-wide metric means used as the
+            reference trace; falls back to a flat 7/10 reference
+    """
     categories = ['Pitch Velocity', 'Exit Velocity', 'Launch Angle']
+    keys = ['pitch_velocity', 'exit_velocity', 'launch_angle']
     max_values = [105, 120, 45]  # Maximum expected values for each metric
 
     # Normalize values to 0-10 scale
-    values = [
-        metrics['pitch_velocity'] / max_values[0] * 10,
-        metrics['exit_velocity'] / max_values[1] * 10,
-        metrics['launch_angle'] / max_values[2] * 10
-    ]
+    values = [metrics[key] / max_value * 10 for key, max_value in zip(keys, max_values)]
+    if league_average:
+        reference = [league_average[key] / max_value * 10 for key, max_value in zip(keys, max_values)]
+    else:
+        reference = [7, 7, 7]
 
     fig = go.Figure()
 
@@ -150,7 +243,7 @@ def create_video_metrics_chart(metrics):
 
     # Add a reference line for average values
     fig.add_trace(go.Scatterpolar(
-        r=[7, 7, 7],  # Example reference values
+        r=reference,
         theta=categories,
         fill='toself',
         name='League Average',